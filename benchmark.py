@@ -0,0 +1,219 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+import config
+from geometry import make_segment_checker
+from path_smoothing import smooth_path
+from rrt_planner import PlannerParams, plan
+
+# Benchmark do planejador sem interface gráfica.
+# Exemplo:
+#   python benchmark.py --seeds 20 --modes rrt,rrt_connect --nn kdtree,grid,brute --json bench.json
+#   python benchmark.py --baseline bench.json   (acusa regressões de tempo em relação a uma execução anterior)
+# Também mede a inicialização de 'python main.py plan' (processo novo, do início ao fim) e confere que
+# nenhum módulo pesado (pygame, matplotlib, djitellopy) foi importado para só planejar.
+
+HEAVY_MODULES = ("pygame", "matplotlib", "djitellopy")
+STARTUP_SCRIPT = ("import runpy, sys; sys.argv = ['main.py', 'plan']; runpy.run_path('main.py', run_name='__main__'); "
+                  f"print('HEAVY=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+
+
+@dataclass
+class Scenario:
+    name: str
+    width: int
+    height: int
+    start: tuple
+    goal: tuple
+    obstacles: list
+    step_size: float = 35
+    safety_margin: int = 20
+    obstacle_margin: float = 0
+    max_iterations: int = 2000
+
+
+def random_clutter(width, height, start, goal, count, size_range, seed, keep_clear=30):
+    """ Caixas aleatórias (reproduzíveis pela semente) que não encostam no início nem no alvo. """
+    rng = random.Random(seed)
+    obstacles = []
+    while len(obstacles) < count:
+        w, h = rng.randint(*size_range), rng.randint(*size_range)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        if any(x - keep_clear <= px <= x + w + keep_clear and y - keep_clear <= py <= y + h + keep_clear
+               for px, py in (start, goal)):
+            continue
+        obstacles.append((x, y, w, h))
+    return obstacles
+
+
+def build_scenarios():
+    """ Corpus padrão: layout do config, obstáculos aleatórios, passagem estreita e arena grande. """
+    return {
+        "config": Scenario("config", config.SCREEN_WIDTH, config.SCREEN_HEIGHT, config.START_POS, config.GOAL_POS,
+                           list(config.OBSTACLES), config.RRT_STEP_SIZE, config.SAFETY_MARGIN_CM,
+                           config.OBSTACLE_MARGIN_CM, config.RRT_MAX_ITERATIONS),
+        "clutter": Scenario("clutter", 400, 400, (30, 30), (370, 370),
+                            random_clutter(400, 400, (30, 30), (370, 370), 25, (15, 45), seed=1),
+                            step_size=35, safety_margin=10),
+        "narrow": Scenario("narrow", 300, 200, (30, 100), (270, 100),
+                           [(140, 0, 20, 92), (140, 108, 20, 92), (70, 40, 20, 120), (210, 40, 20, 120)],
+                           step_size=25, safety_margin=5, max_iterations=5000),
+        "large": Scenario("large", 2000, 2000, (50, 50), (1950, 1950),
+                          random_clutter(2000, 2000, (50, 50), (1950, 1950), 120, (40, 200), seed=2),
+                          step_size=100, safety_margin=20, max_iterations=20000),
+    }
+
+
+def run_one(scenario, mode, nn_index, collision, seed, smoothing=True):
+    params = PlannerParams(width=scenario.width, height=scenario.height, max_iterations=scenario.max_iterations,
+                           step_size=scenario.step_size, safety_margin=scenario.safety_margin,
+                           obstacle_margin=scenario.obstacle_margin, nn_index=nn_index, collision=collision,
+                           mode=mode, seed=seed,
+                           occupancy_resolution=max(1, scenario.width // 400) if collision == "grid" else None)
+    result = plan(scenario.start, scenario.goal, scenario.obstacles, params)
+    row = {
+        "scenario": scenario.name, "mode": mode, "nn_index": nn_index, "collision": collision, "seed": seed,
+        "success": result.success, "time_s": result.elapsed_s, "time_to_first_s": result.time_to_first_s,
+        "iterations": result.iterations, "nodes": result.nodes, "collision_checks": result.collision_checks,
+        "path_length": result.cost, "waypoints": len(result.path), "waypoints_smoothed": None,
+    }
+    if smoothing and result.success:
+        collides = make_segment_checker(scenario.obstacles, scenario.obstacle_margin)
+        smoothed, _ = smooth_path(result.path, collides, rng=random.Random(seed))
+        row["waypoints_smoothed"] = len(smoothed)
+    return row
+
+
+def summarize(rows):
+    """ Medianas por combinação (cenário, modo, índice, colisão). """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["scenario"], row["mode"], row["nn_index"], row["collision"]), []).append(row)
+    summary = []
+    for (scenario, mode, nn_index, collision), runs in groups.items():
+        ok = [r for r in runs if r["success"]]
+        med = lambda key: statistics.median(r[key] for r in ok) if ok else None
+        summary.append({
+            "scenario": scenario, "mode": mode, "nn_index": nn_index, "collision": collision,
+            "runs": len(runs), "success_rate": len(ok) / len(runs),
+            "median_time_to_first_s": med("time_to_first_s"), "median_time_s": med("time_s"),
+            "median_iterations": med("iterations"), "median_nodes": med("nodes"),
+            "median_collision_checks": med("collision_checks"), "median_path_length": med("path_length"),
+            "median_waypoints": med("waypoints"),
+        })
+    return summary
+
+
+def compare_to_baseline(summary, baseline, tolerance):
+    """ Lista as combinações cujo tempo mediano piorou mais que a tolerância (ex.: 0.25 = 25%). """
+    key = lambda s: (s["scenario"], s["mode"], s["nn_index"], s["collision"])
+    previous = {key(s): s for s in baseline.get("summary", [])}
+    regressions = []
+    for s in summary:
+        old = previous.get(key(s))
+        if not old or not old["median_time_s"] or s["median_time_s"] is None: continue
+        ratio = s["median_time_s"] / old["median_time_s"]
+        if ratio > 1 + tolerance or s["success_rate"] < old["success_rate"]:
+            regressions.append({**s, "baseline_time_s": old["median_time_s"], "ratio": ratio,
+                                "baseline_success_rate": old["success_rate"]})
+    return regressions
+
+
+def measure_startup(runs):
+    """ Tempo de parede de 'python main.py plan' em processos novos (inclui o interpretador). """
+    times, heavy = [], set()
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True).stdout
+        times.append(time.perf_counter() - t0)
+        heavy.update(m for line in out.splitlines() if line.startswith("HEAVY=") for m in line[6:].split(",") if m)
+    return {"command": "main.py plan", "median_s": statistics.median(times), "runs_s": times,
+            "heavy_modules": sorted(heavy)}
+
+
+def print_summary(summary):
+    print(f"{'cenário':<9}{'modo':<19}{'índice':<8}{'colisão':<9}{'ok':>6}{'t1 (ms)':>10}{'iter':>8}"
+          f"{'nós':>8}{'colisões':>10}{'compr.':>9}{'wps':>6}")
+    fmt = lambda v, f: format(v, f) if v is not None else "-"
+    for s in summary:
+        t1 = s["median_time_to_first_s"] * 1000 if s["median_time_to_first_s"] is not None else None
+        print(f"{s['scenario']:<9}{s['mode']:<19}{s['nn_index']:<8}{s['collision']:<9}{s['success_rate']:>6.0%}"
+              f"{fmt(t1, '10.2f')}{fmt(s['median_iterations'], '8.0f')}{fmt(s['median_nodes'], '8.0f')}"
+              f"{fmt(s['median_collision_checks'], '10.0f')}{fmt(s['median_path_length'], '9.1f')}"
+              f"{fmt(s['median_waypoints'], '6.0f')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do planejador RRT (sem interface gráfica).")
+    parser.add_argument("--scenarios", default="config,clutter,narrow,large")
+    parser.add_argument("--modes", default="rrt,rrt_connect")
+    parser.add_argument("--nn", default="kdtree,grid,brute", help="índices de vizinho mais próximo")
+    parser.add_argument("--collision", default="exact", help="exact,grid,sampled")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--json", help="arquivo JSON de saída")
+    parser.add_argument("--csv", help="arquivo CSV de saída (uma linha por execução)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--startup-runs", type=int, default=3, help="medições da inicialização (0 desliga)")
+    args = parser.parse_args(argv)
+
+    corpus = build_scenarios()
+    rows = []
+    for name in args.scenarios.split(","):
+        for mode in args.modes.split(","):
+            for nn_index in args.nn.split(","):
+                for collision in args.collision.split(","):
+                    for seed in range(args.seeds):
+                        rows.append(run_one(corpus[name], mode, nn_index, collision, seed))
+
+    summary = summarize(rows)
+    print_summary(summary)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "machine": platform.machine(),
+        "summary": summary, "runs": rows,
+    }
+    if args.startup_runs:
+        startup = report["startup"] = measure_startup(args.startup_runs)
+        print(f"Inicialização ({startup['command']}): {startup['median_s']:.2f} s (mediana de {args.startup_runs}) | "
+              f"módulos pesados: {', '.join(startup['heavy_modules']) or 'nenhum'}")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)
+        regressions = compare_to_baseline(summary, baseline, args.tolerance)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"[REGRESSÃO] {r['scenario']}/{r['mode']}/{r['nn_index']}/{r['collision']}: "
+                  f"{r['baseline_time_s']*1000:.2f} ms -> {r['median_time_s']*1000:.2f} ms ({r['ratio']:.2f}x)")
+        exit_code = 1 if regressions else 0
+        base_startup = baseline.get("startup") if args.startup_runs else None
+        if base_startup and report["startup"]["median_s"] > base_startup["median_s"] * (1 + args.tolerance):
+            print(f"[REGRESSÃO] inicialização: {base_startup['median_s']:.2f} s -> {report['startup']['median_s']:.2f} s")
+            report["startup_regression"] = True
+            exit_code = 1
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados salvos em '{args.json}'")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader(); writer.writerows(rows)
+        print(f"Resultados salvos em '{args.csv}'")
+    return exit_code
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
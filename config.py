@@ -1,6 +1,4 @@
 # config.py
-import pygame
-
 # --- CONFIGURAÇÕES DA SIMULAÇÃO E AMBIENTE ---
 # Mantendo a área total de 2m x 2m (200cm x 200cm)
 SCREEN_WIDTH = 200
@@ -15,12 +13,18 @@ GOAL_POS = (133, 133)
 
 SAFETY_MARGIN_CM = 20
 
+# Folga aplicada em volta de cada obstáculo na checagem de colisão.
+# Idealmente seria SAFETY_MARGIN_CM, mas com 20cm o GOAL_POS atual ficaria
+# dentro da Caixa 2 inflada e o planejador nunca chegaria ao alvo.
+OBSTACLE_MARGIN_CM = 5
+
 # --- Lista de Obstáculos (x, y, largura, altura) ---
+# Tuplas simples, para que o planejador não dependa do pygame.
 # Os valores de X foram calculados com base nas suas medidas.
 # Os valores de Y são exemplos. Você deve medir e ajustar.
 OBSTACLES = [
     # Caixa 1
-    pygame.Rect(
+    (
         32,  # x: lado esquerdo a 32cm da borda esquerda
         50,  # y: <<< SUBSTITUA PELA DISTÂNCIA DO TOPO DA CAIXA ATÉ A BORDA DE CIMA
         37,  # largura
@@ -28,7 +32,7 @@ OBSTACLES = [
     ),
     
     # Caixa 2
-    pygame.Rect(
+    (
         111, # x: calculado para o lado direito ficar a 52cm da borda direita
         80,  # y: <<< SUBSTITUA PELA DISTÂNCIA DO TOPO DA CAIXA ATÉ A BORDA DE CIMA
         37,  # largura
@@ -36,12 +40,109 @@ OBSTACLES = [
     ),
 
     # (Opcional) Adicione mais obstáculos se necessário, seguindo o mesmo formato.
-    # pygame.Rect(x, y, largura, altura),
+    # (x, y, largura, altura),
 ]
 
 # --- CONFIGURAÇÕES DO ALGORITMO RRT ---
 RRT_MAX_ITERATIONS = 2000
 RRT_STEP_SIZE = 35 # O "maxd" do passo
+# Índice de vizinho mais próximo: "kdtree", "grid" (células de RRT_STEP_SIZE) ou "brute" (varredura linear original)
+RRT_NN_INDEX = "kdtree"
+# "rrt" para na primeira solução; "rrt_star"/"informed_rrt_star" continuam otimizando o caminho;
+# "prm" consulta um roadmap construído uma vez por layout e guardado em disco
+RRT_MODE = "rrt"
+RRT_TIME_BUDGET_S = None # Orçamento de tempo (s) para os modos anytime; None usa só RRT_MAX_ITERATIONS
+PLANNER_SEED = None # Semente do planejador; fixe um inteiro para planos reproduzíveis
+
+# Planejamento 3D: 2 mantém a altitude fixa (TELLO_TARGET_ALTITUDE); 3 planeja também z (só RRT_MODE = "rrt").
+# Em 3D um obstáculo pode ter altura: (x, y, w, h, topo) ou (x, y, w, h, base, topo); sem altura ocupa todas.
+PLANNER_DIMS = 2
+ALTITUDE_MIN_CM = 20
+ALTITUDE_MAX_CM = 150
+
+# Grade de ocupação + campo de distância (construída uma vez por layout e guardada em disco)
+OCCUPANCY_GRID = False # True: is_free e checagem de colisão pela grade em vez das caixas
+OCCUPANCY_RESOLUTION_CM = 1
+OCCUPANCY_CACHE_DIR = ".cache/occupancy"
+
+# Roadmap do modo "prm" (reconstruído só quando o layout, a margem ou a arena mudam)
+PRM_SAMPLES = 500
+PRM_RADIUS_CM = None # Raio de ligação; None usa 1.5 * RRT_STEP_SIZE
+PRM_CACHE_DIR = ".cache/prm"
+
+# Planejamento paralelo: N árvores com sementes diferentes em processos separados
+PLANNER_PARALLEL = False
+PLANNER_WORKERS = None # None = todos os núcleos
+PLANNER_STRATEGY = "first" # "first" (primeira solução) ou "best" (mais curta até o prazo)
+PLANNER_DEADLINE_S = None # Prazo em segundos para a estratégia "best"
 
 # --- CONFIGURAÇÕES DO DRONE TELLO ---
 TELLO_TARGET_ALTITUDE = 40 # Altura de voo em cm. Aumentei um pouco para segurança.
+
+# Modo de execução dos waypoints:
+#   "legacy" - gira/avança com esperas fixas (1.5s e 1s) como antes
+#   "settle" - mesmos comandos, mas espera o drone acomodar pelo stream de estado
+#   "go"     - um comando 'go x y z speed' por segmento, sem girar
+#   "curve"  - arcos 'curve' por pares de segmentos (cai para 'go' quando o SDK recusa)
+TELLO_EXECUTOR_MODE = "settle"
+TELLO_GO_SPEED_CM_S = 50
+TELLO_SETTLE_SPEED_CM_S = 5 # Abaixo desta velocidade o drone é considerado parado
+
+# --- Replanejamento dinâmico (replanner.py) ---
+REPLANNING = False  # Mantém a árvore viva (enraizada no alvo) e replaneja durante o voo
+# Obstáculos que surgem durante o voo: [(segundos desde o início do voo, [(x, y, w, h), ...]), ...]
+# Ex.: [(8.0, [(60, 110, 30, 30)])]
+REPLAN_EVENTS = []
+
+# --- Estimador de estado (estimator.py) ---
+# Filtro de Kalman sobre a telemetria em vez de somar os segmentos planejados.
+# Desligado até o referencial de vgx/vgy (EST_VELOCITY_FRAME) ser conferido no drone real.
+STATE_ESTIMATOR = False
+EST_ACCEL_NOISE_CM_S2 = 50      # Aceleração não modelada
+EST_VELOCITY_NOISE_CM_S = 10    # Ruído de vgx/vgy/vgz
+EST_TOF_NOISE_CM = 3            # Ruído do sensor de altura (ToF)
+EST_PAD_NOISE_CM = 5            # Ruído da posição do mission pad
+EST_USE_ACCELERATION = False    # Usa agx/agy como entrada do modelo (ruidosos no Tello real)
+EST_PAD_ORIGIN_CM = (0, 0, 0)   # Posição do mission pad no mapa (x, y, z)
+EST_PAD_YAW_DEG = 0             # Direção do eixo +y do pad no mapa (0 = +y do mapa, horário)
+# Cada segmento só parte da posição estimada se o desvio padrão dela estiver abaixo deste limiar; sem
+# mission pad a estimativa vem só das velocidades (quantizadas em dm/s) e deriva, então fica no caminho planejado
+EST_MAX_START_STD_CM = 4
+EST_VELOCITY_FRAME = "world"    # "world": vgx/vgy nos eixos da decolagem (yaw 0 = +y do mapa); "body": frente/direita atuais
+
+# --- Simulador (sim_tello.py) ---
+USE_SIMULATOR = False      # True: voa um Tello simulado em vez do drone real
+SIM_SPEED_CM_S = 70        # Velocidade linear do modelo
+SIM_YAW_RATE_DEG_S = 90    # Velocidade de giro do modelo
+SIM_LATENCY_S = 0.1        # Latência de cada comando
+SIM_NOISE = 0.0            # Desvio padrão do ruído nas leituras de estado (cm, graus, cm/s)
+SIM_MOTION_NOISE = 0.0     # Erro relativo na execução de cada movimento (0.02 = 2%)
+SIM_TIME_SCALE = 1.0       # >1 roda a missão mais rápido que o tempo real
+
+# --- PÓS-PROCESSAMENTO DO CAMINHO ---
+PATH_SMOOTHING = True # Atalhos + junção de segmentos colineares antes do voo
+PATH_SHORTCUT_ITERATIONS = 200 # Tentativas de atalho aleatório
+
+# Valores usados apenas para estimar o tempo de missão
+TELLO_EST_SPEED_CM_S = 70
+TELLO_EST_YAW_RATE_DEG_S = 90
+
+# --- TELEMETRIA ---
+TELEMETRY_RATE_HZ = 20 # Amostras por segundo lidas do stream de estado do Tello
+TELEMETRY_BUFFER_SIZE = 4096 # Capacidade do buffer circular (amostras mais recentes)
+TELLO_SPEED_SCALE = 10 # vgx/vgy/vgz chegam em dm/s; multiplica para cm/s
+
+# Log binário do voo (gravado durante o voo; sobrevive a um crash). None desliga.
+FLIGHT_LOG_DIR = "logs"
+FLIGHT_LOG_FLUSH_S = 1.0 # Intervalo máximo entre flushes para o disco
+
+# --- Relatório de fim de voo (report.py) ---
+REPORT_MODE = "full"        # "full" (JPG 300 dpi), "fast" (PNG 100 dpi) ou "vector" (SVG)
+REPORT_PARALLEL = True      # Renderiza os gráficos ao mesmo tempo, um processo por gráfico
+REPORT_DIR = "."
+REPORT_CACHE_DIR = ".cache/reports" # None desliga o cache
+
+# --- Instrumentação (instrumentation.py) ---
+INSTRUMENTATION = False       # Cronometra planejador, desenho e comandos do Tello (também: main.py ... --profile)
+INSTRUMENTATION_TRACE = False # Grava também um trace do Chrome (chrome://tracing, ui.perfetto.dev); --trace
+INSTRUMENTATION_DIR = "logs"  # Pasta do resumo perf_<data>.json (e do trace_<data>.json)
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+
+# Estimador de posição/velocidade por filtro de Kalman, na taxa da telemetria.
+# Os três eixos (x, y, z) são independentes com modelo de velocidade constante e a
+# aceleração medida como entrada, então o filtro é um lote de 3 filtros 2x2:
+# estado s[eixo] = (posição, velocidade), covariância P[eixo] 2x2. Cada medida é escalar
+# por eixo (posição ou velocidade) e é aplicada aos três eixos de uma vez com uma máscara,
+# sem inversão de matrizes; a atualização custa dezenas de microssegundos.
+# Medidas usadas:
+#   vgx/vgy/vgz  -> velocidade (cm/s, no referencial da decolagem ou no do drone, ver velocity_frame)
+#   agx/agy      -> aceleração horizontal do drone (mg), girada pelo yaw, como entrada do modelo
+#   tof          -> altura (cm, descontando tof_offset_cm)
+#   mission pad  -> posição x/y/z absoluta, quando mid >= 0, levada do referencial do pad para o do mapa
+#                   pela origem e pelo yaw do pad (pad_origin, pad_yaw_deg; mesma convenção de yaw abaixo)
+# O yaw não é estimado: a leitura do stream é usada para girar as grandezas do referencial do drone.
+# Convenção do repositório (executor e plotter): yaw 0 aponta para +y do mapa e o yaw cresce no sentido
+# horário, então "frente" com yaw 0 é +y e "direita" é +x. Assim vgx (frente) vai para y e vgy (direita) para x.
+
+MG_TO_CM_S2 = 0.980665
+POS, VEL = 0, 1
+
+
+class KalmanEstimator:
+    def __init__(self, accel_noise=50.0, velocity_noise=10.0, tof_noise=3.0, pad_noise=5.0,
+                 use_acceleration=False, velocity_frame="world", tof_offset_cm=10.0, max_tof_cm=800.0,
+                 pad_origin=(0.0, 0.0, 0.0), pad_yaw_deg=0.0):
+        self.accel_noise = accel_noise        # desvio padrão da aceleração não modelada (cm/s²)
+        self.velocity_noise = velocity_noise  # cm/s
+        self.tof_noise = tof_noise            # cm
+        self.pad_noise = pad_noise            # cm
+        self.use_acceleration = use_acceleration
+        # "world": vgx/vgy nos eixos da decolagem (frente/direita com yaw 0); "body": frente/direita atuais do drone
+        self.velocity_frame = velocity_frame
+        self.tof_offset_cm = tof_offset_cm
+        self.max_tof_cm = max_tof_cm
+        self.pad_origin = tuple(float(c) for c in pad_origin)  # posição (x, y, z) do pad no mapa
+        self.pad_yaw_deg = pad_yaw_deg                          # direção do +y do pad no mapa
+        self.updates = 0
+        self.reset()
+
+    def reset(self, position=(0.0, 0.0, 0.0), position_std=5.0, velocity_std=5.0):
+        self.s = np.zeros((3, 2))
+        self.s[:, POS] = position if len(position) == 3 else (*position, 0.0)
+        self.P = np.zeros((3, 2, 2))
+        self.P[:, POS, POS] = position_std ** 2
+        self.P[:, VEL, VEL] = velocity_std ** 2
+        self.t = None
+
+    # --- Leituras ---
+    def position(self): return self.s[:, POS].copy()
+    def velocity(self): return self.s[:, VEL].copy()
+    def covariance(self): return self.P.copy()
+    def position_std(self): return np.sqrt(self.P[:, POS, POS])
+
+    def pad_to_map(self, mpx, mpy, mpz):
+        """ Posição lida do mission pad (referencial do pad) -> coordenadas do mapa. """
+        r = math.radians(self.pad_yaw_deg)
+        ox, oy, oz = self.pad_origin
+        return (ox + mpx * math.cos(r) + mpy * math.sin(r), oy - mpx * math.sin(r) + mpy * math.cos(r), oz + mpz)
+
+    # --- Filtro ---
+    def predict(self, dt, accel=(0.0, 0.0, 0.0)):
+        if dt <= 0: return
+        a = np.asarray(accel, dtype=float)
+        self.s[:, POS] += self.s[:, VEL] * dt + 0.5 * a * dt * dt
+        self.s[:, VEL] += a * dt
+        # P = F P F^T + Q com F = [[1, dt], [0, 1]], aberto termo a termo para os 3 eixos
+        P = self.P
+        p00, p01, p11 = P[:, 0, 0].copy(), P[:, 0, 1].copy(), P[:, 1, 1].copy()
+        q = self.accel_noise ** 2
+        P[:, 0, 0] = p00 + 2 * dt * p01 + dt * dt * p11 + q * dt ** 4 / 4
+        P[:, 0, 1] = P[:, 1, 0] = p01 + dt * p11 + q * dt ** 3 / 2
+        P[:, 1, 1] = p11 + q * dt * dt
+
+    def correct(self, k, z, variance, mask):
+        """ Medida escalar da componente k (POS ou VEL) nos eixos da máscara. """
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.any(): return
+        innov = np.where(mask, np.asarray(z, dtype=float) - self.s[:, k], 0.0)
+        S = self.P[:, k, k] + variance
+        K = np.where(mask[:, None], self.P[:, :, k] / S[:, None], 0.0)
+        self.s += K * innov[:, None]
+        # P = (I - K H) P, com H selecionando a componente k
+        self.P -= K[:, :, None] * self.P[:, k, None, :]
+
+    def update_state(self, t, state, yaw=None):
+        """ Um passo completo a partir dos campos do stream de estado (dicionário ou registro). """
+        yaw = float(state["yaw"]) if yaw is None else yaw
+        r = math.radians(yaw)
+        sin_r, cos_r = math.sin(r), math.cos(r)
+        accel = (0.0, 0.0, 0.0)
+        if self.use_acceleration:
+            # agx para frente, agy para a direita do drone
+            fwd, right = float(state["agx"]) * MG_TO_CM_S2, float(state["agy"]) * MG_TO_CM_S2
+            accel = (fwd * sin_r + right * cos_r, fwd * cos_r - right * sin_r, 0.0)
+        if self.t is not None: self.predict(t - self.t, accel)
+        self.t = t
+
+        fwd, right, vz = float(state["vgx"]), float(state["vgy"]), float(state["vgz"])
+        if self.velocity_frame == "body":
+            vx, vy = fwd * sin_r + right * cos_r, fwd * cos_r - right * sin_r
+        else:
+            vx, vy = right, fwd  # mesma rotação com yaw 0
+        self.correct(VEL, (vx, vy, vz), self.velocity_noise ** 2, (True, True, True))
+
+        tof = float(state["tof"])
+        if self.tof_offset_cm < tof < self.max_tof_cm:
+            self.correct(POS, (0.0, 0.0, tof - self.tof_offset_cm), self.tof_noise ** 2, (False, False, True))
+        if int(state["mid"]) >= 0:
+            self.correct(POS, self.pad_to_map(float(state["mpx"]), float(state["mpy"]), float(state["mpz"])),
+                         self.pad_noise ** 2, (True, True, True))
+        self.updates += 1
+
+    def update_record(self, rec):
+        """ Atualiza com um registro de telemetria (SAMPLE_DTYPE, velocidades já em cm/s)
+        e grava nele a posição estimada e o desvio padrão. """
+        self.update_state(float(rec["t"]), rec)
+        rec["x"], rec["y"], rec["z"] = self.s[:, POS]
+        std = self.position_std()
+        rec["x_std"], rec["y_std"] = std[0], std[1]
+        return rec
+
+    def run(self, records):
+        """ Refiltra um histórico inteiro (p.ex. um log de voo) e retorna as estimativas (n x 3) e desvios. """
+        positions = np.empty((len(records), 3))
+        stds = np.empty((len(records), 3))
+        for i, rec in enumerate(records):
+            self.update_state(float(rec["t"]), rec)
+            positions[i], stds[i] = self.s[:, POS], self.position_std()
+        return positions, stds
+
+
+def estimator_from_config(config):
+    return KalmanEstimator(config.EST_ACCEL_NOISE_CM_S2, config.EST_VELOCITY_NOISE_CM_S, config.EST_TOF_NOISE_CM,
+                           config.EST_PAD_NOISE_CM, config.EST_USE_ACCELERATION, config.EST_VELOCITY_FRAME,
+                           pad_origin=config.EST_PAD_ORIGIN_CM, pad_yaw_deg=config.EST_PAD_YAW_DEG)
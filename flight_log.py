@@ -0,0 +1,77 @@
+import json
+import os
+import struct
+import time
+import numpy as np
+from telemetry import SAMPLE_DTYPE
+
+# Log binário append-only do voo: cabeçalho + registros de tamanho fixo (SAMPLE_DTYPE).
+#   b"TLOG" | versão (uint16) | tamanho do JSON (uint32) | JSON com o dtype e metadados | registros...
+# Como os registros são gravados crus e com flush periódico, um crash no meio do voo
+# perde no máximo o último intervalo de flush, e o arquivo pode ser lido via memmap.
+
+MAGIC = b"TLOG"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+
+
+class FlightLogWriter:
+    """ Escreve registros de telemetria em disco, agrupando em blocos e forçando flush periódico. """
+    def __init__(self, path, dtype=SAMPLE_DTYPE, flush_interval_s=1.0, block_size=64, metadata=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.flush_interval_s = flush_interval_s
+        self.block = np.zeros(block_size, dtype=self.dtype)
+        self.pending = 0
+        self.count = 0
+        self.last_flush = time.monotonic()
+        self.f = open(path, "wb")
+        meta = json.dumps({"dtype": np.lib.format.dtype_to_descr(self.dtype), "metadata": metadata or {}}).encode()
+        self.f.write(_HEADER.pack(MAGIC, VERSION, len(meta)) + meta)
+        self.f.flush()
+
+    def __len__(self): return self.count
+
+    def append(self, record):
+        self.block[self.pending] = record
+        self.pending += 1
+        self.count += 1
+        if self.pending == len(self.block) or time.monotonic() - self.last_flush >= self.flush_interval_s:
+            self.flush()
+
+    def flush(self):
+        if self.f.closed: return
+        if self.pending:
+            self.f.write(self.block[:self.pending].tobytes())
+            self.pending = 0
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if not self.f.closed:
+            self.flush(); self.f.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+def read_header(path):
+    """ Retorna (dtype, metadados, offset_dos_registros). """
+    with open(path, "rb") as f:
+        magic, version, size = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC: raise ValueError(f"'{path}' não é um log de voo")
+        if version != VERSION: raise ValueError(f"Versão de log não suportada: {version}")
+        header = json.loads(f.read(size))
+    dtype = np.lib.format.descr_to_dtype(header["dtype"])
+    return dtype, header["metadata"], _HEADER.size + size
+
+
+def load_flight_log(path):
+    """ Mapeia o log em memória (somente leitura), sem reprocessar os registros.
+    Um registro incompleto no final (voo interrompido) é ignorado. """
+    dtype, _, offset = read_header(path)
+    n = (os.path.getsize(path) - offset) // dtype.itemsize
+    if n == 0: return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,))
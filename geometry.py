@@ -0,0 +1,172 @@
+# Testes geométricos exatos usados pelo planejador.
+# Obstáculos são retângulos (x, y, largura, altura); internamente viram
+# caixas alinhadas aos eixos (xmin, ymin, xmax, ymax) já infladas pela margem.
+# Em 3D o obstáculo pode ganhar altura: (x, y, w, h, topo) vai do chão até o topo e
+# (x, y, w, h, base, topo) fica suspenso; sem altura ele ocupa todas as altitudes.
+# No planejamento 2D só a projeção (x, y, w, h) é usada.
+import math
+import numpy as np
+
+
+def inflate_box(obs, margin=0):
+    """ Converte um retângulo (x, y, w, h) em caixa (xmin, ymin, xmax, ymax) inflada pela margem. """
+    x, y, w, h = obs[:4]
+    return (x - margin, y - margin, x + w + margin, y + h + margin)
+
+
+def point_in_box(x, y, box):
+    xmin, ymin, xmax, ymax = box
+    return xmin <= x <= xmax and ymin <= y <= ymax
+
+
+def segment_intersects_box(x1, y1, x2, y2, box):
+    """ Interseção exata segmento x caixa (Liang–Barsky). Tocar a borda conta como colisão. """
+    xmin, ymin, xmax, ymax = box
+    # Broadphase: caixa envolvente do segmento contra a caixa do obstáculo
+    if max(x1, x2) < xmin or min(x1, x2) > xmax or max(y1, y2) < ymin or min(y1, y2) > ymax:
+        return False
+    dx, dy = x2 - x1, y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0: return False  # paralelo e fora da faixa
+            continue
+        r = q / p
+        if p < 0:
+            if r > t1: return False
+            if r > t0: t0 = r
+        else:
+            if r < t0: return False
+            if r < t1: t1 = r
+    return True
+
+
+def segments_intersect_box(x1, y1, x2, y2, box):
+    """ Liang–Barsky vetorizado: máscara dos segmentos (arrays x1, y1, x2, y2) que tocam a caixa. """
+    xmin, ymin, xmax, ymax = box
+    x1, y1, x2, y2 = (np.asarray(a, dtype=np.float64) for a in (x1, y1, x2, y2))
+    dx, dy = x2 - x1, y2 - y1
+    t0, t1 = np.zeros_like(x1), np.ones_like(x1)
+    hit = ~((np.maximum(x1, x2) < xmin) | (np.minimum(x1, x2) > xmax) |
+            (np.maximum(y1, y2) < ymin) | (np.minimum(y1, y2) > ymax))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+            parallel = p == 0
+            hit &= ~(parallel & (q < 0))
+            r = q / np.where(parallel, 1.0, p)
+            entering, leaving = ~parallel & (p < 0), ~parallel & (p > 0)
+            t0 = np.where(entering, np.maximum(t0, r), t0)
+            t1 = np.where(leaving, np.minimum(t1, r), t1)
+    return hit & (t0 <= t1)
+
+
+def z_range(obs):
+    """ Faixa de altitude ocupada pelo obstáculo. """
+    if len(obs) == 5: return 0.0, float(obs[4])
+    if len(obs) == 6: return float(obs[4]), float(obs[5])
+    return -math.inf, math.inf
+
+
+def inflate_box3(obs, margin=0):
+    """ Obstáculo -> caixa 3D (xmin, ymin, zmin, xmax, ymax, zmax) inflada pela margem. """
+    xmin, ymin, xmax, ymax = inflate_box(obs, margin)
+    zmin, zmax = z_range(obs)
+    return (xmin, ymin, zmin - margin, xmax, ymax, zmax + margin)
+
+
+def point_in_box3(x, y, z, box):
+    return box[0] <= x <= box[3] and box[1] <= y <= box[4] and box[2] <= z <= box[5]
+
+
+def segment_intersects_box3(x1, y1, z1, x2, y2, z2, box):
+    """ Liang–Barsky nos três eixos. Tocar a face conta como colisão. """
+    p1, p2 = (x1, y1, z1), (x2, y2, z2)
+    for a in range(3):
+        if max(p1[a], p2[a]) < box[a] or min(p1[a], p2[a]) > box[a + 3]: return False
+    t0, t1 = 0.0, 1.0
+    for a in range(3):
+        d = p2[a] - p1[a]
+        for p, q in ((-d, p1[a] - box[a]), (d, box[a + 3] - p1[a])):
+            if p == 0:
+                if q < 0: return False
+                continue
+            r = q / p
+            if p < 0:
+                if r > t1: return False
+                if r > t0: t0 = r
+            else:
+                if r < t0: return False
+                if r < t1: t1 = r
+    return True
+
+
+def path_clearance3(path, obstacles, step=0.5):
+    """ Folga mínima de um caminho 3D até os obstáculos (sem margem) e a de cada segmento.
+    Cada segmento é amostrado a cada `step` cm e a distância ponto-caixa é vetorizada sobre todas as
+    caixas; obstáculos sem altura contam em todas as altitudes, como no planejamento. """
+    if not obstacles:
+        return math.inf, [math.inf] * (len(path) - 1)
+    boxes = np.array([inflate_box3(obs) for obs in obstacles], dtype=np.float64)
+    lo, hi = boxes[:, :3], boxes[:, 3:]
+
+    def clearance(points):
+        gap = np.maximum(np.maximum(lo[None] - points[:, None], points[:, None] - hi[None]), 0.0)
+        return float(np.sqrt(np.einsum('pbk,pbk->pb', gap, gap)).min())
+
+    per_segment = []
+    for p, q in zip(path, path[1:]):
+        p, q = np.asarray(p, dtype=np.float64), np.asarray(q, dtype=np.float64)
+        t = np.linspace(0.0, 1.0, max(2, int(np.linalg.norm(q - p) / step) + 1))
+        per_segment.append(clearance(p + t[:, None] * (q - p)))
+    if not per_segment:
+        return clearance(np.asarray(path[:1], dtype=np.float64)), per_segment
+    return min(per_segment), per_segment
+
+
+def segment_intersects_box_sampled(x1, y1, x2, y2, box, samples=101):
+    """ Checagem antiga por amostragem de pontos; mantida só para comparação nos benchmarks. """
+    for i in range(samples):
+        t = i / (samples - 1)
+        if point_in_box(x1 + t * (x2 - x1), y1 + t * (y2 - y1), box): return True
+    return False
+
+
+def arc_points(p1, p2, p3, samples=24):
+    """ Pontos do arco de circunferência que sai de p1, passa por p2 e termina em p3 (o caminho do
+    'curve' do Tello), em 2D ou 3D. Pontos colineares não definem arco: devolve a poligonal p1, p2, p3. """
+    dims = len(p1)
+    a, b, c = (tuple(p) + (0.0,) * (3 - dims) for p in (p1, p2, p3))
+    u = [bi - ai for ai, bi in zip(a, b)]
+    v = [ci - ai for ai, ci in zip(a, c)]
+    cross = lambda s, t: (s[1] * t[2] - s[2] * t[1], s[2] * t[0] - s[0] * t[2], s[0] * t[1] - s[1] * t[0])
+    dot = lambda s, t: sum(si * ti for si, ti in zip(s, t))
+    w = cross(u, v)
+    ww = dot(w, w)
+    if ww < 1e-9 * dot(u, u) * dot(v, v):
+        return [tuple(p1), tuple(p2), tuple(p3)]
+    # Centro da circunferência pelos três pontos; e1/e2 formam a base do plano, no sentido p1 -> p2 -> p3
+    vw, wu, uu, vv = cross(v, w), cross(w, u), dot(u, u), dot(v, v)
+    center = [ai + (uu * vw[k] + vv * wu[k]) / (2 * ww) for k, ai in enumerate(a)]
+    r = [ai - ci for ai, ci in zip(a, center)]
+    radius = math.sqrt(dot(r, r))
+    e1 = [ri / radius for ri in r]
+    n = [wi / math.sqrt(ww) for wi in w]
+    e2 = cross(n, e1)
+    q = [ci - ki for ci, ki in zip(c, center)]
+    end = math.atan2(dot(q, e2), dot(q, e1)) % (2 * math.pi)
+    points = []
+    for i in range(samples + 1):
+        t = end * i / samples
+        point = [ci + radius * (math.cos(t) * x + math.sin(t) * y) for ci, x, y in zip(center, e1, e2)]
+        points.append(tuple(point[:dims]))
+    return points
+
+
+def make_segment_checker(obstacles, margin=0, dims=2):
+    """ Função (x1, y1, x2, y2) -> bool que diz se o segmento colide com algum obstáculo inflado.
+    Com dims=3 a função recebe (x1, y1, z1, x2, y2, z2) e respeita a altura dos obstáculos. """
+    if dims == 3:
+        boxes3 = [inflate_box3(obs, margin) for obs in obstacles]
+        return lambda *seg: any(segment_intersects_box3(*seg, box) for box in boxes3)
+    boxes = [inflate_box(obs, margin) for obs in obstacles]
+    return lambda x1, y1, x2, y2: any(segment_intersects_box(x1, y1, x2, y2, box) for box in boxes)
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+# Instrumentação dos pontos quentes: contadores e histogramas de tempo por nome ("rrt.expand",
+# "tello.move_forward", "view.update_display", ...), exportados como resumo JSON por execução e,
+# opcionalmente, como trace do Chrome (abrir em chrome://tracing ou ui.perfetto.dev).
+#
+# Desligada (o padrão), não custa nada nos laços quentes: wrap() devolve o objeto intocado e só
+# instala cronômetros nos métodos da instância quando a instrumentação está ligada. count() e span()
+# custam uma checagem de None e ficam reservados a pontos fora dos laços internos.
+# Só o processo atual é medido (os processos do planejamento paralelo e do plotter não entram).
+
+BUCKETS = 32  # histograma log2 em microssegundos: balde b cobre [2^(b-1), 2^b) us
+MAX_TRACE_EVENTS = 1_000_000
+
+_recorder = None
+
+
+class Timer:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count, self.total, self.min, self.max = 0, 0.0, float("inf"), 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, dt):
+        self.count += 1; self.total += dt
+        if dt < self.min: self.min = dt
+        if dt > self.max: self.max = dt
+        self.buckets[min(BUCKETS - 1, int(dt * 1e6).bit_length())] += 1
+
+    def percentile(self, q):
+        """ Limite superior (us) do balde que contém o percentil q; estimativa pelo histograma. """
+        target, acc = q * self.count, 0
+        for b, n in enumerate(self.buckets):
+            acc += n
+            if acc >= target: return min(float(1 << b), self.max * 1e6)
+        return self.max * 1e6
+
+    def as_dict(self):
+        return {"count": self.count, "total_ms": self.total * 1e3, "mean_us": self.total / self.count * 1e6,
+                "min_us": self.min * 1e6, "max_us": self.max * 1e6, "p50_us": self.percentile(0.5),
+                "p90_us": self.percentile(0.9), "p99_us": self.percentile(0.99),
+                "histogram_us": {f"<{1 << b}": n for b, n in enumerate(self.buckets) if n}}
+
+
+class Recorder:
+    def __init__(self, trace=False):
+        self.timers, self.counters = {}, {}
+        self.trace = [] if trace else None
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()  # amostras chegam das threads de voo, telemetria e planejamento
+
+    def record(self, name, start, dt):
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None: timer = self.timers[name] = Timer()
+            timer.add(dt)
+            if self.trace is not None and len(self.trace) < MAX_TRACE_EVENTS:
+                self.trace.append((name, start, dt, threading.get_ident()))
+
+    def count(self, name, n=1):
+        with self.lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self, meta=None):
+        with self.lock:
+            timers = {k: t.as_dict() for k, t in sorted(self.timers.items(), key=lambda kv: -kv[1].total)}
+            counters = dict(sorted(self.counters.items()))
+        return {"created": datetime.now().isoformat(timespec="seconds"), "wall_s": time.perf_counter() - self.t0,
+                "meta": meta or {}, "timers": timers, "counters": counters}
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        with self.lock: events = list(self.trace or ())
+        return {"traceEvents": [{"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                                 "ts": (start - self.t0) * 1e6, "dur": dt * 1e6}
+                                for name, start, dt, tid in events],
+                "displayTimeUnit": "ms"}
+
+
+def enable(trace=False):
+    """ Liga a instrumentação (zerando o que havia). Só afeta objetos passados a wrap() daqui em diante. """
+    global _recorder
+    _recorder = Recorder(trace)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+def enabled(): return _recorder is not None
+
+
+def count(name, n=1):
+    if _recorder is not None: _recorder.count(name, n)
+
+
+def _timed(recorder, name, fn):
+    record, clock = recorder.record, time.perf_counter
+    def timed(*args, **kwargs):
+        t0 = clock()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            recorder.count(name + ".errors"); raise
+        finally:
+            record(name, t0, clock() - t0)
+    return timed
+
+
+def wrap(obj, names, prefix):
+    """ Cronometra os métodos `names` desta instância (os que existirem), como prefix + nome.
+    Com a instrumentação desligada devolve o objeto sem tocar em nada. """
+    if _recorder is None: return obj
+    for name in names:
+        fn = getattr(obj, name, None)
+        if callable(fn): setattr(obj, name, _timed(_recorder, prefix + name.lstrip("_"), fn))
+    return obj
+
+
+def span(name):
+    """ with span("fase"): ... — cronometra um bloco (para trechos grossos, fora dos laços quentes). """
+    if _recorder is None: return nullcontext()
+    return _Span(_recorder, name)
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "t0")
+
+    def __init__(self, recorder, name): self.recorder, self.name = recorder, name
+    def __enter__(self): self.t0 = time.perf_counter()
+    def __exit__(self, *exc): self.recorder.record(self.name, self.t0, time.perf_counter() - self.t0)
+
+
+def print_summary(summary, top=15):
+    print(f"\n{'ponto':<34}{'n':>9}{'total (ms)':>12}{'média (us)':>12}{'p90 (us)':>10}{'máx (us)':>11}")
+    for name, t in list(summary["timers"].items())[:top]:
+        print(f"{name:<34}{t['count']:>9}{t['total_ms']:>12.1f}{t['mean_us']:>12.1f}{t['p90_us']:>10.0f}"
+              f"{t['max_us']:>11.0f}")
+    for name, n in summary["counters"].items():
+        print(f"{name:<34}{n:>9}")
+
+
+def finish(out_dir=".", meta=None, top=15):
+    """ Grava perf_<data>.json (e trace_<data>.json, se o trace estiver ligado), imprime os pontos mais
+    caros e desliga a instrumentação. Retorna os arquivos gravados. """
+    if _recorder is None: return []
+    recorder = _recorder
+    disable()
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    summary = recorder.summary(meta)
+    print_summary(summary, top)
+    files = [os.path.join(out_dir, f"perf_{stamp}.json")]
+    with open(files[0], "w") as f: json.dump(summary, f, indent=2)
+    if recorder.trace is not None:
+        files.append(os.path.join(out_dir, f"trace_{stamp}.json"))
+        with open(files[1], "w") as f: json.dump(recorder.chrome_trace(), f)
+    print("Instrumentação salva em " + ", ".join(f"'{p}'" for p in files))
+    return files
+
+
+def enable_from_config(config, force=False, trace=False):
+    if force or config.INSTRUMENTATION:
+        return enable(trace or config.INSTRUMENTATION_TRACE)
+    return None
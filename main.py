@@ -1,14 +1,17 @@
-import pygame
+import os
+import argparse
+import json
 import time
 import threading
 import config
+import instrumentation
 from datetime import datetime
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D # Necessário para o plot 3D
 import multiprocessing as mp
-from rrt_planner import find_rrt_path
-from tello_handler import TelloManager
-from plotter import RealTimePlotter
+
+# Ponto de entrada: python main.py [plan|fly|simulate|report] ...
+# Os módulos pesados (pygame, matplotlib, djitellopy) só são importados pelo comando que os usa,
+# então planejar sem janela (python main.py plan) não paga o custo deles.
+# Sem subcomando o comportamento é o de sempre: planeja com a janela do pygame e voa.
 
 def console_input_listener(cancel_event):
     """Escuta o console para o comando de cancelamento 'c'."""
@@ -22,120 +25,253 @@ def console_input_listener(cancel_event):
             break
     print(">>> Listener do console finalizado.")
 
-def save_final_plot_2d(manager, planned_path, config):
-    """Cria e salva um gráfico estático 2D com o resultado final do voo."""
-    print("Salvando o gráfico final da trajetória 2D...")
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    filename = f"trajetoria_final_2d_{timestamp}.jpg"
-    fig, ax = plt.subplots(figsize=(10, 10))
-    ax.set_aspect('equal', adjustable='box')
-    ax.set_title('Resultado Final da Trajetória (2D)')
-    ax.set_xlabel('Eixo X (cm)'); ax.set_ylabel('Eixo Y (cm)')
-    ax.grid(True)
-    ax.set_xlim(0, config.SCREEN_WIDTH); ax.set_ylim(0, config.SCREEN_HEIGHT)
-    px, py = zip(*planned_path)
-    ax.plot(px, py, 'r--', label='Caminho Planejado')
-    if len(manager.path_history) > 1:
-        _, real_x, real_y, _, _, _, _, _, _ = zip(*manager.path_history)
-        ax.plot(real_x, real_y, 'b-', label='Caminho Real')
-    ax.plot(px, py, 'ko', markersize=4, label='Nós do RRT')
-    ax.legend(); fig.savefig(filename, dpi=300)
-    print(f"Gráfico 2D salvo como '{filename}'")
-    plt.close(fig)
-
-def save_final_plot_3d(manager, planned_path, config):
-    """Cria e salva um gráfico estático 3D com o resultado final do voo."""
-    print("Salvando o gráfico final da trajetória 3D...")
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    filename = f"trajetoria_final_3d_{timestamp}.jpg"
-    fig = plt.figure(figsize=(10, 10))
-    ax = fig.add_subplot(111, projection='3d')
-    ax.set_title('Resultado Final da Trajetória (3D)')
-    ax.set_xlabel('Eixo X (cm)'); ax.set_ylabel('Eixo Y (cm)'); ax.set_zlabel('Altitude Z (cm)')
-    ax.set_xlim(0, config.SCREEN_WIDTH); ax.set_ylim(0, config.SCREEN_HEIGHT); ax.set_zlim(0, 150)
-    px, py = zip(*planned_path)
-    pz = [config.TELLO_TARGET_ALTITUDE] * len(px)
-    ax.plot(px, py, pz, 'r--', label='Caminho Planejado')
-    if len(manager.path_history) > 1:
-        _, real_x, real_y, real_z, _, _, _, _, _ = zip(*manager.path_history)
-        ax.plot(real_x, real_y, real_z, 'b-', label='Caminho Real')
-    ax.legend(); fig.savefig(filename, dpi=300)
-    print(f"Gráfico 3D salvo como '{filename}'")
-    plt.close(fig)
-
-def save_velocity_plot(manager):
-    """Cria e salva um gráfico da velocidade do drone ao longo do tempo."""
-    print("Salvando o gráfico de velocidade...")
-    if len(manager.path_history) < 2:
-        print("Não há dados de velocidade suficientes para plotar.")
-        return
-
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    filename = f"velocidade_vs_tempo_{timestamp}.jpg"
-    
-    times, _, _, _, _, _, _, speeds, waypoint_indices = zip(*manager.path_history)
-
-    fig, ax = plt.subplots(figsize=(12, 6))
-    ax.set_title('Velocidade do Drone vs. Tempo')
-    ax.set_xlabel('Tempo (s)')
-    ax.set_ylabel('Velocidade (cm/s)')
-    ax.grid(True)
-    
-    ax.plot(times, speeds, '-', label='Velocidade')
-    
-    last_wp = -1
-    for i, wp_index in enumerate(waypoint_indices):
-        if wp_index != last_wp and wp_index > 0:
-            ax.axvline(x=times[i], color='r', linestyle='--', linewidth=0.8)
-            ax.text(times[i] + 0.1, max(speeds)*0.9, f'WP {wp_index}', rotation=90, color='r')
-            last_wp = wp_index
-            
-    ax.legend()
-    fig.savefig(filename, dpi=300)
-    print(f"Gráfico de velocidade salvo como '{filename}'")
-    plt.close(fig)
-
-def plotter_process(plotter_class, data_queue, path):
+def plotter_process(ring_name, ring_capacity, path):
     """ Função que será executada em um processo separado para o plotter 2D. """
     import config
-    plotter = plotter_class(data_queue, config)
+    from plotter import RealTimePlotter
+    from shm_ring import SharedRing
+    plotter = RealTimePlotter(SharedRing.attach(ring_name, ring_capacity), config)
     plotter.run(path)
 
-def main():
-    _, path = find_rrt_path(config)
+def smoother(config, obstacles=None):
+    """ Suavização com os parâmetros do config; obstacles=None usa os obstáculos atuais do config. """
+    from geometry import make_segment_checker
+    from path_smoothing import smooth_path
+    def run(path):
+        collides = make_segment_checker(config.OBSTACLES if obstacles is None else obstacles(), config.OBSTACLE_MARGIN_CM,
+                                        config.PLANNER_DIMS)
+        return smooth_path(path, collides, config.PATH_SHORTCUT_ITERATIONS,
+                           config.TELLO_EST_SPEED_CM_S, config.TELLO_EST_YAW_RATE_DEG_S)
+    return run
+
+def plan_headless(config):
+    """ Planejamento sem janela (nem pygame importado). """
+    from rrt_planner import PlannerParams, plan
+    result = plan(config.START_POS, config.GOAL_POS, config.OBSTACLES, PlannerParams.from_config(config))
+    if not result.success:
+        print("Caminho não encontrado dentro do limite de iterações."); return None
+    print(f"Caminho encontrado em {result.iterations} iterações ({result.elapsed_s*1000:.1f} ms, {result.nodes} nós)!")
+    return result.path
+
+def plan_path(config, view=True):
+    """ Planeja (com replanejamento, em paralelo, com a janela do pygame ou sem janela), suaviza e
+    relata a folga. Retorna (caminho, replanner); caminho None se o planejamento falhou ou foi cancelado. """
+    replanner = None
+    if config.REPLANNING:
+        from replanner import replanner_from_config
+        replanner = replanner_from_config(config)
+        report = replanner.replan(config.START_POS)
+        path = report.path
+        print(f"Árvore de replanejamento: {report.nodes} nós, {report.latency_s*1000:.1f} ms")
+    elif config.PLANNER_PARALLEL:
+        from parallel_planner import plan_parallel_from_config
+        result, runs = plan_parallel_from_config(config)
+        path = result.path if result else None
+        if result:
+            print(f"Melhor de {len(runs)} execuções: semente {result.seed}, {result.cost:.1f} cm, "
+                  f"{result.elapsed_s*1000:.1f} ms")
+    elif view:
+        import pygame
+        from rrt_view import find_rrt_path
+        _, path = find_rrt_path(config)
+        pygame.quit()
+    else:
+        path = plan_headless(config)
     if not path:
-        print("Programa encerrado durante o planejamento."); return
+        return None, replanner
 
-    print("Caminho a ser executado:", path)
-    pygame.quit()
+    if config.PATH_SMOOTHING:
+        with instrumentation.span("main.smoothing"):
+            path, report = smoother(config)(path)
+        if replanner is not None:
+            # Os caminhos replanejados passam pela mesma suavização, contra os obstáculos do momento
+            replanner.postprocess = lambda p: smoother(config, lambda: replanner.obstacles)(p)[0]
+        print(f"Suavização: {report['waypoints_before']} -> {report['waypoints_after']} waypoints | "
+              f"tempo estimado {report['est_time_before_s']:.1f}s -> {report['est_time_after_s']:.1f}s")
 
-    if input("Deseja iniciar o voo? (s/n): ").lower() != 's':
-        print("Voo cancelado pelo usuário."); return
+    with instrumentation.span("main.clearance"):
+        if config.PLANNER_DIMS == 3:
+            # A grade de ocupação é 2D: em 3D a folga é medida contra as caixas, com a altura delas
+            from geometry import path_clearance3
+            min_clearance, _ = path_clearance3(path, config.OBSTACLES, config.OCCUPANCY_RESOLUTION_CM / 2)
+        else:
+            from occupancy import load_or_build
+            grid = load_or_build(config.OBSTACLES, config.SCREEN_WIDTH, config.SCREEN_HEIGHT,
+                                 config.OCCUPANCY_RESOLUTION_CM, config.OBSTACLE_MARGIN_CM,
+                                 config.OCCUPANCY_CACHE_DIR)
+            min_clearance, _ = grid.path_clearance(path)
+    print(f"Folga mínima do caminho até os obstáculos: {min_clearance:.1f} cm")
+    return path, replanner
 
-    data_queue = mp.Queue()
+def fly(config, path, next_legs=None, replanner=None, live_plot=True, final_report=True):
+    """ Voa o caminho (e os trechos seguintes, se houver) com plotter ao vivo e gera o relatório. """
+    from shm_ring import SharedRing
+    from tello_handler import TelloManager
+    from estimator import estimator_from_config
+    data_ring = SharedRing(config.TELEMETRY_BUFFER_SIZE)
     cancel_event = mp.Event()
-    manager = TelloManager(data_queue, cancel_event)
-    
+    # Caminhos 3D trazem a altitude de cada waypoint; a decolagem vai até a do primeiro
+    altitude = path[0][2] if len(path[0]) > 2 else config.TELLO_TARGET_ALTITUDE
+    log_path = None
+    if config.FLIGHT_LOG_DIR:
+        log_path = os.path.join(config.FLIGHT_LOG_DIR, f"voo_{datetime.now().strftime('%Y%m%d-%H%M%S')}.tlog")
+    tello = None
+    if config.USE_SIMULATOR:
+        from sim_tello import sim_from_config
+        tello = sim_from_config(config, path[0])
+        print(f"Usando o Tello simulado (escala de tempo {config.SIM_TIME_SCALE}x).")
+    manager = TelloManager(data_ring, cancel_event, config.TELEMETRY_RATE_HZ, config.TELEMETRY_BUFFER_SIZE,
+                           config.TELLO_SPEED_SCALE, log_path, config.FLIGHT_LOG_FLUSH_S,
+                           config.TELLO_EXECUTOR_MODE, config.TELLO_GO_SPEED_CM_S, config.TELLO_SETTLE_SPEED_CM_S,
+                           tello, estimator_from_config(config) if config.STATE_ESTIMATOR else None,
+                           log_metadata={"planned_path": [list(p) for p in path], "obstacles": config.OBSTACLES,
+                                         "width": config.SCREEN_WIDTH, "height": config.SCREEN_HEIGHT,
+                                         "target_altitude": altitude},
+                           obstacles=(lambda: replanner.obstacles) if replanner is not None else (lambda: config.OBSTACLES),
+                           obstacle_margin=config.OBSTACLE_MARGIN_CM, max_start_std_cm=config.EST_MAX_START_STD_CM)
+
     input_thread = threading.Thread(target=console_input_listener, args=(cancel_event,), daemon=True)
-    flight_thread = threading.Thread(target=manager.execute_flight_plan, args=(path, config.TELLO_TARGET_ALTITUDE))
-    
-    # Apenas o processo do plotter 2D é iniciado
-    plot_process_2d = mp.Process(target=plotter_process, args=(RealTimePlotter, data_queue, path))
-    
-    input_thread.start(); flight_thread.start(); plot_process_2d.start()
+    flight_thread = threading.Thread(target=manager.execute_flight_plan,
+                                     args=(path, altitude, next_legs))
+
+    # Apenas o processo do plotter 2D é iniciado (e só se pedido: voos sem monitor dispensam a janela)
+    plot_process_2d = None
+    if live_plot:
+        plot_process_2d = mp.Process(target=plotter_process, args=(data_ring.name, data_ring.capacity, path))
+
+    input_thread.start(); flight_thread.start()
+    if plot_process_2d is not None: plot_process_2d.start()
+    if replanner is not None and config.REPLAN_EVENTS:
+        from replanner import run_replan_events
+        run_replan_events(replanner, manager, config.REPLAN_EVENTS, cancel_event, config.TELLO_GO_SPEED_CM_S)
     flight_thread.join()
     print("\nVoo finalizado. Salvando resultados...")
 
-    if plot_process_2d.is_alive():
+    if plot_process_2d is not None and plot_process_2d.is_alive():
         plot_process_2d.terminate(); plot_process_2d.join()
+    data_ring.close()
 
-    # Salva todos os gráficos finais
-    save_final_plot_2d(manager, path, config)
-    save_final_plot_3d(manager, path, config)
-    save_velocity_plot(manager)
-    
+    if final_report:
+        # Salva todos os gráficos finais (em paralelo, a partir de um único instantâneo do histórico)
+        from report import render_reports, snapshot_from_config
+        planned = [p for leg in manager.flown_paths for p in leg] or path
+        with instrumentation.span("main.report"):
+            render_reports(snapshot_from_config(manager.records(), planned, config), config.REPORT_DIR,
+                           config.REPORT_MODE, parallel=config.REPORT_PARALLEL, cache_dir=config.REPORT_CACHE_DIR)
+    elif log_path:
+        print(f"Relatório não gerado; para gerá-lo depois: python main.py report {log_path}")
+    return manager
+
+def run_batch(config, goals, live_plot=True, final_report=True):
+    """ Missão em lote: voa START_POS -> alvo 1 -> alvo 2 -> ... sem prompts, planejando o próximo
+    trecho em segundo plano durante o voo do atual. """
+    from mission_queue import mission_planner_from_config
+    planner = mission_planner_from_config(config, (lambda p: smoother(config)(p)[0]) if config.PATH_SMOOTHING else None)
+    legs = planner.iter_legs(config.START_POS, goals)
+    first = next(legs, None)
+    if first is None:
+        print("Não foi possível planejar o primeiro trecho."); return
+    fly(config, first, legs, live_plot=live_plot, final_report=final_report)
+    reused = sum(1 for *_, source, _ in planner.legs if source == "roadmap")
+    print(f"{len(planner.legs)} trechos planejados ({reused} pelo roadmap). Programa finalizado.")
+
+def cmd_plan(args):
+    path, _ = plan_path(config, args.view)
+    if not path:
+        print("Programa encerrado durante o planejamento."); return 1
+    print("Caminho planejado:", path)
+    if args.out:
+        with open(args.out, "w") as f: json.dump([list(p) for p in path], f)
+        print(f"Caminho salvo em '{args.out}' (voe com: python main.py fly --path {args.out})")
+    return 0
+
+def cmd_fly(args):
+    if args.command == "simulate":
+        config.USE_SIMULATOR = True
+        if args.time_scale: config.SIM_TIME_SCALE = args.time_scale
+    options = {"live_plot": not args.no_live_plot, "final_report": not args.no_report}
+    if args.goals or args.goals_file:
+        from mission_queue import load_goals, parse_goals
+        run_batch(config, load_goals(args.goals_file) if args.goals_file else parse_goals(args.goals), **options)
+        return 0
+
+    replanner = None
+    if args.path:
+        with open(args.path) as f: path = [tuple(p) for p in json.load(f)]
+    else:
+        path, replanner = plan_path(config, args.view)
+    if not path:
+        print("Programa encerrado durante o planejamento."); return 1
+
+    print("Caminho a ser executado:", path)
+
+    if not args.yes and input("Deseja iniciar o voo? (s/n): ").lower() != 's':
+        print("Voo cancelado pelo usuário."); return 0
+
+    fly(config, path, replanner=replanner, **options)
     print("Programa finalizado.")
+    return 0
+
+def cmd_report(args):
+    import report
+    report.main(args.report_args)
+    return 0
+
+def add_profile_args(p):
+    p.add_argument("--profile", action="store_true", help="liga a instrumentação (resumo perf_<data>.json)")
+    p.add_argument("--trace", action="store_true", help="com a instrumentação, grava também um trace do Chrome")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Planeja e executa a missão do Tello.")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("plan", help="só planeja (sem janela, a não ser com --view)")
+    p.add_argument("--view", action="store_true", help="mostra o crescimento da árvore na janela do pygame")
+    p.add_argument("--out", help="salva o caminho planejado em JSON")
+    add_profile_args(p)
+    p.set_defaults(func=cmd_plan)
+
+    for name, help_text in (("fly", "planeja e voa o Tello real"), ("simulate", "planeja e voa o Tello simulado")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--no-view", dest="view", action="store_false", help="planeja sem a janela do pygame")
+        p.add_argument("--no-live-plot", action="store_true", help="não abre o plotter ao vivo durante o voo")
+        p.add_argument("--no-report", action="store_true", help="não gera os gráficos de fim de voo")
+        p.add_argument("--yes", "-y", action="store_true", help="não pergunta antes de decolar")
+        p.add_argument("--path", help="voa um caminho salvo por 'plan --out' em vez de planejar")
+        p.add_argument("--goals", help="fila de alvos 'x,y; x,y; ...' (modo em lote, sem prompts)")
+        p.add_argument("--goals-file", help="arquivo com a fila de alvos (JSON ou um 'x y' por linha)")
+        add_profile_args(p)
+        if name == "simulate":
+            p.add_argument("--time-scale", type=float, help="sobrepõe SIM_TIME_SCALE")
+        p.set_defaults(func=cmd_fly)
+
+    p = sub.add_parser("report", help="regenera os gráficos a partir de um log de voo (ver report.py --help)",
+                       add_help=False)
+    p.add_argument("report_args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_report)
+    return parser
+
+COMMANDS = ("plan", "fly", "simulate", "report")
+
+def main(argv=None):
+    import sys
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        # Compatibilidade: 'python main.py [--goals ...]' equivale a 'python main.py fly ...'
+        argv = ["fly", *argv]
+    if argv[0] == "report":
+        # Os argumentos (inclusive --help) vão direto para o report.py
+        return cmd_report(argparse.Namespace(report_args=argv[1:]))
+    args = build_parser().parse_args(argv)
+    instrumentation.enable_from_config(config, args.profile or args.trace, args.trace)
+    try:
+        return args.func(args)
+    finally:
+        instrumentation.finish(config.INSTRUMENTATION_DIR,
+                               meta={"command": args.command, "planner_mode": config.RRT_MODE,
+                                     "executor_mode": config.TELLO_EXECUTOR_MODE,
+                                     "simulator": config.USE_SIMULATOR})
 
 if __name__ == '__main__':
     mp.freeze_support()
-    main()
\ No newline at end of file
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from geometry import make_segment_checker
+from roadmap import Roadmap
+from rrt_planner import PlannerParams, plan
+
+# Missão em lote: uma fila de alvos voada em sequência, cada trecho começando no fim do anterior.
+# As árvores de todos os trechos já planejados ficam num roadmap (roadmap.Roadmap); um trecho novo
+# é tentado primeiro como consulta A* nesse roadmap e só cai no RRT quando o roadmap não liga os
+# dois pontos. O trecho seguinte é planejado em segundo plano enquanto o atual está sendo voado.
+
+
+def parse_goals(text):
+    """ "133,133; 40,160" -> [(133, 133), (40, 160)] """
+    goals = []
+    for item in text.replace("\n", ";").split(";"):
+        item = item.split("#")[0].strip()
+        if item: goals.append(tuple(float(v) for v in item.replace(",", " ").split()[:2]))
+    return goals
+
+
+def load_goals(path):
+    """ Arquivo de alvos: lista JSON [[x, y], ...] ou um alvo "x y" / "x,y" por linha (# comenta). """
+    with open(path) as f: text = f.read()
+    if text.lstrip().startswith("["):
+        return [tuple(map(float, g[:2])) for g in json.loads(text)]
+    return parse_goals(text)
+
+
+class MissionPlanner:
+    def __init__(self, obstacles, params=None, postprocess=None, link_radius=None):
+        self.obstacles = obstacles
+        self.params = params or PlannerParams()
+        if self.params.dims != 2:
+            raise ValueError("A missão em lote só está disponível no planejamento 2D")
+        self.postprocess = postprocess  # p.ex. suavização: caminho -> caminho
+        self.collides = make_segment_checker(obstacles, self.params.obstacle_margin)
+        self.link_radius = link_radius or self.params.step_size
+        self.roadmap = Roadmap()
+        self.legs = []  # (início, alvo, origem "roadmap"/"rrt", ms)
+
+    def _add_graph(self, graph):
+        for tree in getattr(graph, "trees", (graph,)):
+            first, last = self.roadmap.add_tree(tree)
+            self.roadmap.link(first, last, self.link_radius, self.collides)
+
+    def plan_leg(self, start, goal):
+        """ Planeja um trecho; retorna o caminho ou None. """
+        t0 = time.perf_counter()
+        path, source = self.roadmap.query(start, goal, self.link_radius, self.collides), "roadmap"
+        if path is None:
+            result = plan(start, goal, self.obstacles, self.params)
+            if result.graph is not None: self._add_graph(result.graph)
+            path, source = (result.path if result.success else None), "rrt"
+        if path is not None and self.postprocess: path = self.postprocess(path)
+        ms = (time.perf_counter() - t0) * 1000
+        self.legs.append((start, goal, source, ms))
+        status = "ok" if path else "sem caminho"
+        print(f"\nTrecho {start} -> {goal}: {status} via {source} em {ms:.1f} ms")
+        return path
+
+    def iter_legs(self, start, goals):
+        """ Gera os caminhos trecho a trecho; o próximo é planejado em segundo plano assim que o
+        atual é entregue (isto é, enquanto ele é voado). Para na primeira falha. """
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self.plan_leg, start, goals[0]) if goals else None
+            for i, goal in enumerate(goals):
+                path = future.result()
+                if path is None: return
+                if i + 1 < len(goals): future = pool.submit(self.plan_leg, goal, goals[i + 1])
+                yield path
+
+
+def mission_planner_from_config(config, postprocess=None):
+    return MissionPlanner(config.OBSTACLES, PlannerParams.from_config(config), postprocess)
@@ -0,0 +1,196 @@
+import math
+from array import array
+from itertools import product
+from operator import add
+from node_store import NodeStore
+
+# Índices de vizinho mais próximo usados pelo RRTGraph.
+# Todos seguem a mesma interface mínima:
+#   insert(idx, point) -> registra o nó idx na posição point
+#   pop()              -> remove o último nó inserido
+#   nearest(point, exclude=None) -> índice do nó mais próximo (ou None)
+# O RRT só remove o último nó adicionado, então pop() basta para manter o sincronismo.
+
+
+def _dist2(a, b):
+    return sum((ai - bi) ** 2 for ai, bi in zip(a, b))
+
+
+class BruteForceIndex:
+    """ Varredura sobre todos os nós (referência para comparação).
+    Com um NodeStore, a varredura é vetorizada sobre os arrays do próprio store. """
+    def __init__(self, dims=2, store=None):
+        self.dims = dims
+        self.store = store
+        self.ids, self.points = [], []
+
+    def __len__(self): return len(self.store) if self.store is not None else len(self.ids)
+
+    def insert(self, idx, point):
+        if self.store is None:
+            self.ids.append(idx); self.points.append(tuple(point))
+
+    def pop(self):
+        if self.store is None:
+            self.ids.pop(); self.points.pop()
+
+    def nearest(self, point, exclude=None):
+        if self.store is not None:
+            return self.store.nearest(point, exclude)
+        best, dmin = None, math.inf
+        for idx, p in zip(self.ids, self.points):
+            if idx == exclude: continue
+            d = _dist2(p, point)
+            if d < dmin: dmin, best = d, idx
+        return best
+
+
+class GridIndex:
+    """ Grade uniforme com células de tamanho fixo (normalmente o RRT_STEP_SIZE).
+    As coordenadas são lidas do NodeStore (idx = posição no store); cada célula guarda só os
+    índices, em um array int32. Sem store, o índice mantém um NodeStore próprio.
+    A consulta olha só a vizinhança imediata do ponto (3x3 em 2D, 3x3x3 em 3D): qualquer nó fora
+    dela está a pelo menos uma célula de distância, então se ali há um nó mais perto que isso ele é
+    o mais próximo. Senão (grade esparsa, ponto longe da árvore) a varredura vetorizada do store
+    resolve de uma vez; percorrer anéis cada vez maiores em Python custaria mais que ela. """
+    def __init__(self, cell_size, dims=2, store=None):
+        self.cell = float(cell_size)
+        self.dims = dims
+        self.own_store = store is None
+        self.store = NodeStore(dims) if store is None else store
+        self.n = 0
+        self.cells = {}
+        self.offsets = sorted(product((-1, 0, 1), repeat=dims), key=lambda o: sum(map(abs, o)))
+        self._base = self._mv = None
+
+    def __len__(self): return self.n
+
+    def _coords(self):
+        """ memoryview das coordenadas (leitura de floats Python sem passar pelo NumPy);
+        refeita quando o store realoca os arrays. """
+        if self.store.coords is not self._base:
+            self._base = self.store.coords
+            self._mv = memoryview(self._base)
+        return self._mv
+
+    def _key(self, point):
+        return tuple(int(math.floor(c / self.cell)) for c in point)
+
+    def _stored_key(self, idx):
+        mv = self._coords()
+        return self._key([mv[idx, a] for a in range(self.dims)])
+
+    def insert(self, idx, point):
+        """ idx precisa ser o próximo índice (0, 1, 2, ...), como no NodeStore. """
+        if self.own_store: self.store.add(point)
+        key = self._stored_key(idx)
+        bucket = self.cells.get(key)
+        if bucket is None: bucket = self.cells[key] = array("i")
+        bucket.append(idx)
+        self.n += 1
+
+    def pop(self):
+        # O store não apaga as coordenadas do nó removido, então a chave ainda pode ser recalculada
+        self.n -= 1
+        key = self._stored_key(self.n)
+        bucket = self.cells[key]
+        bucket.pop()
+        if not bucket: del self.cells[key]
+        if self.own_store: self.store.pop()
+
+    def nearest(self, point, exclude=None):
+        if not self.n: return None
+        mv, dims, cells = self._coords(), range(self.dims), self.cells
+        center = self._key(point)
+        best, dmin = None, math.inf
+        for offset in self.offsets:
+            bucket = cells.get(tuple(map(add, center, offset)))
+            if not bucket: continue
+            for idx in bucket:
+                if idx == exclude: continue
+                d = 0.0
+                for a in dims:
+                    t = mv[idx, a] - point[a]; d += t * t
+                if d < dmin: dmin, best = d, idx
+        if dmin <= self.cell * self.cell:
+            return best
+        return self.store.nearest(point, exclude)
+
+
+class KDTreeIndex:
+    """ Árvore k-d construída incrementalmente (sem rebalanceamento).
+    Não copia os pontos: as coordenadas vêm do NodeStore (idx = posição no store) e a árvore guarda
+    só os filhos e o pai de cada nó em arrays int32 (-1 = nenhum), 12 bytes por nó.
+    Sem store, o índice mantém um NodeStore próprio. """
+    def __init__(self, dims=2, store=None):
+        self.dims = dims
+        self.own_store = store is None
+        self.store = NodeStore(dims) if store is None else store
+        self.left, self.right, self.up = array("i"), array("i"), array("i")
+        self.root = -1
+        self._base = self._mv = None
+
+    def __len__(self): return len(self.up)
+
+    def _coords(self):
+        if self.store.coords is not self._base:
+            self._base = self.store.coords
+            self._mv = memoryview(self._base)
+        return self._mv
+
+    def insert(self, idx, point):
+        """ idx precisa ser o próximo índice (0, 1, 2, ...), como no NodeStore. """
+        if self.own_store: self.store.add(point)
+        self.left.append(-1); self.right.append(-1); self.up.append(-1)
+        if self.root < 0:
+            self.root = idx; return
+        mv = self._coords()
+        point = [mv[idx, a] for a in range(self.dims)]  # a mesma precisão usada nas consultas
+        cur, depth = self.root, 0
+        while True:
+            axis = depth % self.dims
+            side = self.left if point[axis] < mv[cur, axis] else self.right
+            if side[cur] < 0:
+                side[cur] = idx; self.up[idx] = cur; return
+            cur, depth = side[cur], depth + 1
+
+    def pop(self):
+        # O último nó inserido é sempre uma folha: basta desligá-lo do pai
+        node = len(self.up) - 1
+        parent = self.up[node]
+        if parent < 0: self.root = -1
+        elif self.left[parent] == node: self.left[parent] = -1
+        else: self.right[parent] = -1
+        self.left.pop(); self.right.pop(); self.up.pop()
+        if self.own_store: self.store.pop()
+
+    def nearest(self, point, exclude=None):
+        if self.root < 0: return None
+        mv, dims, left, right = self._coords(), range(self.dims), self.left, self.right
+        best, dmin = None, math.inf
+        stack = [(self.root, 0, 0.0)]
+        while stack:
+            node, depth, bound = stack.pop()
+            if bound >= dmin: continue
+            if node != exclude:
+                d = 0.0
+                for a in dims:
+                    t = mv[node, a] - point[a]; d += t * t
+                if d < dmin: dmin, best = d, node
+            axis = depth % self.dims
+            diff = point[axis] - mv[node, axis]
+            near, far = (left[node], right[node]) if diff < 0 else (right[node], left[node])
+            # Empilha o lado distante primeiro para visitar o próximo antes
+            if far >= 0 and diff * diff < dmin:
+                stack.append((far, depth + 1, diff * diff))
+            if near >= 0:
+                stack.append((near, depth + 1, bound))
+        return best
+
+
+def make_index(kind, cell_size, dims=2, store=None):
+    """ Cria o índice pelo nome usado em config.RRT_NN_INDEX. """
+    if kind == "kdtree": return KDTreeIndex(dims, store)
+    if kind == "grid": return GridIndex(cell_size, dims, store)
+    if kind == "brute": return BruteForceIndex(dims, store)
+    raise ValueError(f"Índice de vizinho mais próximo desconhecido: {kind!r}")
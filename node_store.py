@@ -0,0 +1,70 @@
+import numpy as np
+
+NO_PARENT = -1
+
+
+class NodeStore:
+    """ Armazena os nós da árvore em arrays NumPy pré-alocados (float32 + int32 = 12 bytes/nó em 2D).
+    Com with_cost=True mantém também o custo acumulado desde a raiz (usado pelo RRT*). """
+    def __init__(self, dims=2, capacity=1024, with_cost=False):
+        self.dims = dims
+        self.n = 0
+        self.coords = np.empty((capacity, dims), dtype=np.float32)
+        self.parent = np.empty(capacity, dtype=np.int32)
+        self.cost = np.empty(capacity, dtype=np.float32) if with_cost else None
+
+    def __len__(self): return self.n
+
+    @property
+    def capacity(self): return len(self.parent)
+
+    def _grow(self):
+        """ Dobra a capacidade, copiando apenas a parte ocupada. """
+        cap = self.capacity * 2
+        coords = np.empty((cap, self.dims), dtype=np.float32); coords[:self.n] = self.coords[:self.n]
+        parent = np.empty(cap, dtype=np.int32); parent[:self.n] = self.parent[:self.n]
+        self.coords, self.parent = coords, parent
+        if self.cost is not None:
+            cost = np.empty(cap, dtype=np.float32); cost[:self.n] = self.cost[:self.n]
+            self.cost = cost
+
+    def add(self, point, parent=NO_PARENT, cost=0.0):
+        if self.n == self.capacity: self._grow()
+        idx = self.n
+        self.coords[idx] = point
+        self.parent[idx] = parent
+        if self.cost is not None: self.cost[idx] = cost
+        self.n += 1
+        return idx
+
+    def pop(self): self.n -= 1
+
+    def compact(self, keep):
+        """ Mantém só os nós marcados em keep (preservando a ordem) e renumera os pais.
+        Os pais dos nós mantidos também precisam ser mantidos. Retorna o mapa antigo -> novo (-1 = removido). """
+        keep = np.asarray(keep, dtype=bool)
+        remap = np.full(self.n, NO_PARENT, dtype=np.int32)
+        remap[keep] = np.arange(int(keep.sum()), dtype=np.int32)
+        parent = self.parent[:self.n][keep]
+        self.parent[:len(parent)] = np.where(parent >= 0, remap[np.maximum(parent, 0)], NO_PARENT)
+        self.coords[:len(parent)] = self.coords[:self.n][keep]
+        if self.cost is not None: self.cost[:len(parent)] = self.cost[:self.n][keep]
+        self.n = len(parent)
+        return remap
+
+    def point(self, i): return tuple(self.coords[i].tolist())
+
+    def distances(self, point):
+        """ Distâncias de todos os nós até o ponto, em uma única operação vetorizada. """
+        diff = self.coords[:self.n] - np.asarray(point, dtype=np.float32)
+        return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+    def nearest(self, point, exclude=None):
+        if self.n == 0: return None
+        d = self.distances(point)
+        if exclude is not None and 0 <= exclude < self.n: d[exclude] = np.inf
+        return int(np.argmin(d))
+
+    def within(self, point, radius):
+        """ Índices dos nós dentro do raio (consulta vetorizada). """
+        return np.flatnonzero(self.distances(point) <= radius)
@@ -0,0 +1,55 @@
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from dataclasses import replace
+from rrt_planner import PlannerParams, plan
+
+
+def _plan_worker(start, goal, obstacles, params, stop_event):
+    """ Executado em cada processo: planeja com a semente recebida e devolve o resultado sem a árvore. """
+    result = plan(start, goal, obstacles, params, should_stop=stop_event.is_set)
+    result.graph = None  # a árvore não volta pelo pickle; só o caminho e as métricas
+    return result
+
+
+def plan_parallel(start, goal, obstacles, params=None, workers=None, seeds=None, strategy="first", deadline_s=None):
+    """ Roda N planejadores independentes (um por semente) em um ProcessPoolExecutor.
+    strategy="first": devolve a primeira solução e cancela os demais.
+    strategy="best":  devolve o caminho mais curto encontrado até deadline_s (ou até todos terminarem).
+    Retorna (melhor_resultado, todos_os_resultados). """
+    params = params or PlannerParams()
+    workers = workers or os.cpu_count() or 1
+    if seeds is None:
+        base = params.seed if params.seed is not None else 0
+        seeds = range(base, base + workers)
+
+    best = None
+    with mp.Manager() as manager:
+        stop = manager.Event()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_plan_worker, start, goal, obstacles, replace(params, seed=s), stop) for s in seeds]
+            try:
+                for fut in as_completed(futures, timeout=deadline_s):
+                    result = fut.result()
+                    if result.success and strategy == "first":
+                        best = result; break
+            except TimeoutError:
+                pass
+            # Sinaliza os que ainda rodam para pararem com o que já têm e descarta os que nem começaram
+            stop.set()
+            for fut in futures:
+                fut.cancel()
+            wait(futures)
+            results = [f.result() for f in futures if not f.cancelled()]
+
+    if best is None:
+        solved = [r for r in results if r.success]
+        best = min(solved, key=lambda r: r.cost) if solved else None
+    return best, results
+
+
+def plan_parallel_from_config(config):
+    params = PlannerParams.from_config(config)
+    return plan_parallel(config.START_POS, config.GOAL_POS, config.OBSTACLES, params,
+                         workers=config.PLANNER_WORKERS, strategy=config.PLANNER_STRATEGY,
+                         deadline_s=config.PLANNER_DEADLINE_S)
@@ -0,0 +1,113 @@
+import math
+import random
+
+# Pós-processamento do caminho do RRT antes do voo.
+# Cada waypoint custa ao TelloManager um get_yaw, um rotate_* (+1.5s de espera),
+# um move_forward (+1s de espera), então menos waypoints = missão mais curta.
+# collides é uma função (x1, y1, x2, y2) -> bool, p.ex. RRTGraph.crosses_obstacle
+# ou geometry.make_segment_checker. Waypoints 3D (x, y, z) também servem, com um collides 3D.
+
+TELLO_MIN_MOVE_CM = 20
+TELLO_MAX_MOVE_CM = 500
+
+
+def _seg_len(p, q): return math.dist(p, q)
+
+
+def shortcut_greedy(path, collides):
+    """ A partir de cada waypoint, pula direto para o waypoint visível mais distante. """
+    if len(path) < 3: return list(path)
+    out, i = [path[0]], 0
+    while i < len(path) - 1:
+        j = len(path) - 1
+        while j > i + 1 and collides(*path[i], *path[j]):
+            j -= 1
+        out.append(path[j]); i = j
+    return out
+
+
+def shortcut_random(path, collides, iterations=100, rng=None):
+    """ Atalhos entre pares aleatórios de waypoints não adjacentes. """
+    rng = rng or random
+    path = list(path)
+    for _ in range(iterations):
+        if len(path) < 3: break
+        i = rng.randrange(0, len(path) - 2)
+        j = rng.randrange(i + 2, len(path))
+        if not collides(*path[i], *path[j]):
+            path = path[:i + 1] + path[j:]
+    return path
+
+
+def merge_collinear(path, collides, tolerance_deg=3.0):
+    """ Remove waypoints intermediários em que a direção quase não muda.
+    O atalho a -> c é checado: os desvios pequenos se acumulam a cada waypoint removido. """
+    if len(path) < 3: return list(path)
+    out = [path[0]]
+    for k in range(1, len(path) - 1):
+        a, b, c = out[-1], path[k], path[k + 1]
+        u = [bi - ai for ai, bi in zip(a, b)]
+        v = [ci - bi for bi, ci in zip(b, c)]
+        norm = math.hypot(*u) * math.hypot(*v)
+        if norm == 0: continue
+        # Ângulo entre as direções dos dois segmentos (vale em 2D e em 3D)
+        turn = math.degrees(math.acos(max(-1.0, min(1.0, sum(ui * vi for ui, vi in zip(u, v)) / norm))))
+        if turn > tolerance_deg or collides(*a, *c): out.append(b)
+    out.append(path[-1])
+    return out
+
+
+def enforce_move_limits(path, collides, min_cm=TELLO_MIN_MOVE_CM, max_cm=TELLO_MAX_MOVE_CM):
+    """ Ajusta o caminho aos limites do move_forward do Tello:
+    segmentos longos são divididos; segmentos curtos são absorvidos quando o atalho é livre. """
+    path = list(path)
+    changed = True
+    while changed and len(path) > 2:
+        changed = False
+        for i in range(len(path) - 1):
+            if _seg_len(path[i], path[i + 1]) >= min_cm: continue
+            # Remove o waypoint que não é o início nem o alvo
+            drop = i if i + 1 == len(path) - 1 else i + 1
+            if drop == 0: continue
+            if not collides(*path[drop - 1], *path[drop + 1]):
+                del path[drop]; changed = True; break
+
+    out = [path[0]]
+    for p, q in zip(path, path[1:]):
+        n = math.ceil(_seg_len(p, q) / max_cm)
+        for k in range(1, n):
+            out.append(tuple(pi + (qi - pi) * k / n for pi, qi in zip(p, q)))
+        out.append(q)
+    return out
+
+
+def estimate_flight_time(path, speed_cm_s, yaw_rate_deg_s, rotate_pause_s=1.5, move_pause_s=1.0, initial_yaw=0.0):
+    """ Estimativa do tempo de voo seguindo a mesma sequência do execute_flight_plan. """
+    total, yaw = 0.0, initial_yaw
+    for p, q in zip(path, path[1:]):
+        dist = _seg_len(p, q)
+        target = math.degrees(math.atan2(q[0] - p[0], q[1] - p[1]))
+        rot = (target - yaw + 180) % 360 - 180
+        if abs(rot) > 5:
+            total += abs(rot) / yaw_rate_deg_s + rotate_pause_s
+            yaw = target
+        if dist > 0:
+            total += max(TELLO_MIN_MOVE_CM, min(TELLO_MAX_MOVE_CM, dist)) / speed_cm_s + move_pause_s
+    return total
+
+
+def smooth_path(path, collides, random_iterations=100, speed_cm_s=70, yaw_rate_deg_s=90, rng=None):
+    """ Aplica atalho guloso + aleatório, junta segmentos colineares e respeita os limites do Tello.
+    Retorna (novo_caminho, relatório). """
+    before = list(path)
+    out = shortcut_greedy(before, collides)
+    out = shortcut_random(out, collides, random_iterations, rng)
+    out = merge_collinear(out, collides)
+    out = enforce_move_limits(out, collides)
+    report = {
+        "waypoints_before": len(before),
+        "waypoints_after": len(out),
+        "est_time_before_s": estimate_flight_time(before, speed_cm_s, yaw_rate_deg_s),
+        "est_time_after_s": estimate_flight_time(out, speed_cm_s, yaw_rate_deg_s),
+    }
+    return out, report
@@ -1,90 +1,135 @@
 # plotter.py
+import math
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from matplotlib.lines import Line2D # CORREÇÃO: Importa a classe Line2D
+from matplotlib.patches import Rectangle, Ellipse
 import numpy as np
 
 class RealTimePlotter:
-    def __init__(self, data_queue, config):
-        self.data_queue = data_queue
+    def __init__(self, data_ring, config, max_trail_points=2000):
+        self.data_ring = data_ring  # shm_ring.SharedRing escrito pela thread do voo
+        self.seq = 0
+        self.dropped = 0
         self.config = config
-        self.path_history = []
-        self.current_state = None
+        # Rastro em arrays pré-alocados que dobram de tamanho; cada quadro só acrescenta o que é novo
+        self.xs = np.empty(1024, dtype=np.float32)
+        self.ys = np.empty(1024, dtype=np.float32)
+        self.n = 0
+        self.last_yaw = 0.0
+        self.last_std = (0.0, 0.0)
+        # Acima disso o rastro é decimado, para o custo do quadro não crescer com a duração do voo
+        self.max_trail_points = max_trail_points
         self.ax = None
         self.actual_path_line = None
         self.drone_marker = None
         # Inicializa as variáveis das setas
         self.quiver_x = None
         self.quiver_y = None
+        self.uncertainty = None
+
+    def _append(self, chunk):
+        k = len(chunk)
+        if self.n + k > len(self.xs):
+            cap = max(len(self.xs) * 2, self.n + k)
+            for name in ("xs", "ys"):
+                grown = np.empty(cap, dtype=np.float32); grown[:self.n] = getattr(self, name)[:self.n]
+                setattr(self, name, grown)
+        self.xs[self.n:self.n + k] = chunk['x']
+        self.ys[self.n:self.n + k] = chunk['y']
+        self.n += k
+        self.last_yaw = float(chunk['yaw'][-1])
+        self.last_std = (float(chunk['x_std'][-1]), float(chunk['y_std'][-1]))
+
+    def _trail(self):
+        """ Visão do rastro, decimada por passo fixo quando passa de max_trail_points. """
+        stride = max(1, math.ceil(self.n / self.max_trail_points))
+        xs, ys = self.xs[:self.n:stride], self.ys[:self.n:stride]
+        if (self.n - 1) % stride:
+            # Garante que o rastro termina na posição atual
+            xs, ys = np.append(xs, self.xs[self.n - 1]), np.append(ys, self.ys[self.n - 1])
+        return xs, ys
 
     def _update_plot(self, frame):
-        # Esvazia a fila para pegar os dados mais recentes
-        while not self.data_queue.empty():
-            self.current_state = self.data_queue.get_nowait()
-            self.path_history.append(self.current_state)
-
-        if not self.path_history:
-            return []
-        
-        # Extrai os dados de posição e orientação
-        _, x_data, y_data, _, _, _, yaw_data, _, _ = zip(*self.path_history)
-        
+        artists = [self.actual_path_line, self.drone_marker, self.quiver_x, self.quiver_y, self.uncertainty]
+        # Lê só as amostras novas desde o último quadro, direto da memória compartilhada
+        chunks, self.seq, dropped = self.data_ring.read_since(self.seq)
+        self.dropped += dropped
+        for chunk in chunks:
+            if len(chunk): self._append(chunk)
+
+        if not self.n:
+            return artists
+
         # Atualiza o rastro e o marcador do drone
-        self.actual_path_line.set_data(x_data, y_data)
-        
+        self.actual_path_line.set_data(*self._trail())
+
         # Pega a última posição e orientação
-        last_x, last_y, last_yaw = x_data[-1], y_data[-1], yaw_data[-1]
+        last_x, last_y, last_yaw = float(self.xs[self.n - 1]), float(self.ys[self.n - 1]), self.last_yaw
         self.drone_marker.set_data([last_x], [last_y])
-        
+
+        # Elipse de 2 desvios padrão da posição estimada (some quando não há estimador)
+        self.uncertainty.set_center((last_x, last_y))
+        self.uncertainty.set_width(4 * self.last_std[0]); self.uncertainty.set_height(4 * self.last_std[1])
+
         # --- Lógica de Atualização das Setas de Orientação ---
         angle_rad = np.radians(last_yaw)
         arrow_len = 15 # Comprimento das setas em cm
-        
+
         # Eixo X do drone (frente, vermelho)
         dx_front = arrow_len * np.sin(angle_rad)
         dy_front = arrow_len * np.cos(angle_rad)
-        
+
         # Eixo Y do drone (direita, verde)
         dx_right = arrow_len * np.cos(angle_rad)
         dy_right = -arrow_len * np.sin(angle_rad)
-        
+
         # Atualiza a posição e a direção das setas
         self.quiver_x.set_offsets((last_x, last_y))
         self.quiver_x.set_UVC(dx_front, dy_front)
-        
+
         self.quiver_y.set_offsets((last_x, last_y))
         self.quiver_y.set_UVC(dx_right, dy_right)
 
-        return [self.actual_path_line, self.drone_marker, self.quiver_x, self.quiver_y]
+        return artists
 
-    def run(self, planned_path_coords):
+    def setup(self, planned_path_coords):
+        """ Monta a figura: o fundo estático (obstáculos, caminho planejado, nós) é desenhado uma vez
+        e guardado pelo blitting; só os artistas animados são redesenhados a cada quadro. """
         fig, ax = plt.subplots(figsize=(10, 10))
         self.ax = ax
-        
+
         ax.set_aspect('equal', adjustable='box')
         ax.set_title('Trajetória 2D em Tempo Real com Orientação')
         ax.set_xlabel('Eixo X (cm)'); ax.set_ylabel('Eixo Y (cm)')
         ax.grid(True)
         ax.set_xlim(0, self.config.SCREEN_WIDTH); ax.set_ylim(0, self.config.SCREEN_HEIGHT)
-        
-        px, py = zip(*planned_path_coords)
+
+        for x, y, w, h, *_ in self.config.OBSTACLES:
+            ax.add_patch(Rectangle((x, y), w, h, color='grey', alpha=0.6))
+
+        px, py = zip(*(p[:2] for p in planned_path_coords))
         ax.plot(px, py, 'r--', label='Caminho Planejado')
         ax.plot(px, py, 'ko', markersize=4, label='Nós do RRT')
-        
-        self.actual_path_line, = ax.plot([], [], 'b-', lw=2, label='Caminho Real')
-        self.drone_marker, = ax.plot([], [], 'go', markersize=8, label='Drone')
+
+        self.actual_path_line, = ax.plot([], [], 'b-', lw=2, label='Caminho Real', animated=True)
+        self.drone_marker, = ax.plot([], [], 'go', markersize=8, label='Drone', animated=True)
+        self.uncertainty = ax.add_patch(Ellipse((0, 0), 0, 0, color='blue', alpha=0.2, animated=True,
+                                                label='Incerteza (2σ)'))
 
         # Cria as setas uma única vez
-        self.quiver_x = self.ax.quiver(0, 0, 0, 0, angles='xy', scale_units='xy', scale=1, color='red', width=0.005)
-        self.quiver_y = self.ax.quiver(0, 0, 0, 0, angles='xy', scale_units='xy', scale=1, color='green', width=0.005)
-        
+        self.quiver_x = self.ax.quiver(0, 0, 0, 0, angles='xy', scale_units='xy', scale=1, color='red', width=0.005, animated=True)
+        self.quiver_y = self.ax.quiver(0, 0, 0, 0, angles='xy', scale_units='xy', scale=1, color='green', width=0.005, animated=True)
+
         # --- Lógica para Legenda Customizada ---
         handles, labels = ax.get_legend_handles_labels()
         arrow_x_legend = Line2D([0], [0], color='red', lw=2, label='Eixo X Drone (Frente)')
         arrow_y_legend = Line2D([0], [0], color='green', lw=2, label='Eixo Y Drone (Direita)')
         handles.extend([arrow_x_legend, arrow_y_legend])
         ax.legend(handles=handles)
-        
-        # blit=False é mais estável quando se manipula artistas complexos como quiver
-        self.ani = FuncAnimation(fig, self._update_plot, interval=200, blit=False, cache_frame_data=False)
-        plt.show()
\ No newline at end of file
+        return fig
+
+    def run(self, planned_path_coords):
+        fig = self.setup(planned_path_coords)
+        self.ani = FuncAnimation(fig, self._update_plot, interval=200, blit=True, cache_frame_data=False)
+        plt.show()
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import replace
+import numpy as np
+from roadmap import Roadmap
+from rrt_planner import PlanResult, make_graph, path_length
+
+# PRM multi-consulta: o roadmap é construído uma vez por layout (amostras livres + arestas
+# livres entre vizinhos), salvo em disco com chave no hash do layout e dos parâmetros, e cada
+# consulta início/alvo vira só a ligação dos dois pontos ao grafo mais um A*.
+# A checagem de colisão é a do próprio planejador (RRTGraph.is_free / crosses_obstacle), então
+# margem, modo "exact"/"grid"/"sampled" e grade de ocupação valem igual para RRT e PRM.
+
+CACHE_VERSION = 1
+_memory = {}  # roadmaps já carregados neste processo, por chave
+
+
+def prm_key(obstacles, params):
+    """ Hash do layout (obstáculos, margem, arena) e dos parâmetros de construção do roadmap. """
+    payload = json.dumps({"v": CACHE_VERSION, "obstacles": [list(map(float, o)) for o in obstacles],
+                          "margin": params.obstacle_margin, "safety": params.safety_margin,
+                          "size": [params.width, params.height], "collision": params.collision,
+                          "res": params.occupancy_resolution, "samples": params.prm_samples,
+                          "radius": prm_radius(params), "k": params.prm_neighbours, "seed": params.seed},
+                         sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def prm_radius(params): return params.prm_radius or 1.5 * params.step_size
+
+
+def collision_oracle(obstacles, params):
+    """ Um RRTGraph vazio usado só pelos testes de colisão, com a mesma configuração do planejador. """
+    return make_graph((0, 0), (0, 0), obstacles, replace(params, mode="rrt"))
+
+
+def build_prm(obstacles, params, oracle=None):
+    oracle = oracle or collision_oracle(obstacles, params)
+    rng = random.Random(params.seed)
+    m = params.safety_margin
+    points = []
+    attempts = 0
+    while len(points) < params.prm_samples and attempts < params.prm_samples * 20:
+        attempts += 1
+        x, y = rng.uniform(m, params.width - m), rng.uniform(m, params.height - m)
+        if oracle.is_free(x, y): points.append((x, y))
+    roadmap = Roadmap()
+    roadmap.add_nodes(points)
+    radius = prm_radius(params)
+    for i in range(len(roadmap)):
+        p = roadmap.point(i)
+        for j in roadmap.neighbours(p, radius, params.prm_neighbours + 1):
+            if j > i and not oracle.crosses_obstacle(*p, *roadmap.point(j)): roadmap.add_edge(i, j)
+    return roadmap
+
+
+def load_or_build_prm(obstacles, params, cache_dir=None, oracle=None):
+    """ Roadmap do layout: da memória, do disco ou construído (e salvo) se o layout mudou. """
+    key = prm_key(obstacles, params)
+    if key in _memory: return _memory[key]
+    path = os.path.join(cache_dir, f"prm_{key}.npz") if cache_dir else None
+    if path and os.path.exists(path):
+        data = np.load(path)
+        roadmap = Roadmap.from_arrays(data["coords"], data["edges"])
+    else:
+        t0 = time.perf_counter()
+        roadmap = build_prm(obstacles, params, oracle)
+        print(f"Roadmap PRM construído: {len(roadmap)} nós, {len(roadmap.edges())} arestas "
+              f"em {(time.perf_counter() - t0) * 1000:.0f} ms")
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.savez_compressed(path, coords=roadmap.coords, edges=roadmap.edges())
+    _memory[key] = roadmap
+    return roadmap
+
+
+def plan_prm(start, goal, obstacles, params):
+    """ Mesmo contrato do plan(): consulta o roadmap (construído só na primeira vez para o layout). """
+    if params.dims != 2: raise ValueError("O modo 'prm' só planeja em 2D")
+    oracle = collision_oracle(obstacles, params)
+    roadmap = load_or_build_prm(obstacles, params, params.prm_cache_dir, oracle)
+    checks0 = oracle.collision_checks
+    t0 = time.perf_counter()
+    n0 = len(roadmap)
+    path = roadmap.query(tuple(start), tuple(goal), prm_radius(params), oracle.crosses_obstacle,
+                         params.prm_neighbours)
+    roadmap.truncate(n0)  # os pontos de consulta não ficam no roadmap compartilhado
+    result = PlanResult(seed=params.seed, nodes=n0, iterations=1)
+    if path:
+        result.path, result.success, result.cost = path, True, path_length(path)
+    result.elapsed_s = result.time_to_first_s = time.perf_counter() - t0
+    result.collision_checks = oracle.collision_checks - checks0
+    return result
@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+import numpy as np
+from geometry import inflate_box, segments_intersect_box
+from rrt_planner import PlannerParams, make_graph, grow
+
+# Replanejamento dinâmico reaproveitando a árvore (no espírito do DRRT, Ferguson et al. 2006).
+# A árvore é enraizada no ALVO da missão e cresce em direção ao drone. Assim, quando o drone se
+# move, a raiz continua válida e basta religar a posição atual à árvore; quando surge (ou muda)
+# um obstáculo, só os nós dentro dele e as arestas que o cruzam são invalidados, junto com as
+# subárvores que dependem deles. O resto da árvore é mantido e o crescimento recomeça dali.
+
+
+@dataclass
+class ReplanReport:
+    path: list = field(default_factory=list)  # da posição atual até o alvo
+    success: bool = False
+    latency_s: float = 0.0     # invalidação + recrescimento + pós-processamento
+    removed_nodes: int = 0
+    nodes: int = 0
+    iterations: int = 0
+    collision_checks: int = 0
+
+
+class Replanner:
+    def __init__(self, start, goal, obstacles, params=None, postprocess=None):
+        self.params = params or PlannerParams()
+        if self.params.mode == "rrt_connect":
+            raise ValueError("O replanejamento precisa de uma única árvore (modos rrt, rrt_star ou informed_rrt_star)")
+        if self.params.dims != 2:
+            raise ValueError("O replanejamento só está disponível no planejamento 2D")
+        self.goal = goal
+        self.obstacles = list(obstacles)
+        self.postprocess = postprocess  # p.ex. suavização: caminho -> caminho
+        self.graph = make_graph(goal, start, self.obstacles, self.params)
+        self.reports = []
+
+    def _retarget(self, position):
+        """ O alvo da árvore passa a ser a posição atual do drone. """
+        g = self.graph
+        g.goal = (float(position[0]), float(position[1]))
+        g.goal_flag, g.goal_state, g.path = False, None, []
+        if hasattr(g, "c_min"): g.c_min = math.hypot(g.goal[0] - g.start[0], g.goal[1] - g.start[1])
+
+    def set_obstacles(self, obstacles):
+        """ Troca a lista de obstáculos e poda o que colide com os novos/movidos. Retorna os nós removidos. """
+        obstacles = list(obstacles)
+        added = [o for o in obstacles if o not in self.obstacles]
+        g, margin = self.graph, self.params.obstacle_margin
+        self.obstacles = g.obstacles = obstacles
+        g.boxes = [inflate_box(o, margin) for o in obstacles]
+        if g.occupancy is not None:
+            from occupancy import load_or_build
+            g.occupancy = load_or_build(obstacles, self.params.width, self.params.height,
+                                        self.params.occupancy_resolution, margin, self.params.occupancy_cache_dir)
+        if not added: return 0
+        n = g.number_of_nodes()
+        x, y, parent = g.x.astype(np.float64), g.y.astype(np.float64), g.parent
+        has_parent = parent >= 0
+        px = np.where(has_parent, x[np.maximum(parent, 0)], x)
+        py = np.where(has_parent, y[np.maximum(parent, 0)], y)
+        invalid = np.zeros(n, dtype=bool)
+        for box in (inflate_box(o, margin) for o in added):
+            # Segmento degenerado (raiz) cobre o teste do próprio ponto
+            invalid |= segments_intersect_box(px, py, x, y, box)
+        if invalid[0]:
+            raise ValueError("O alvo ficou dentro de um obstáculo")
+        return g.prune(invalid)
+
+    def replan(self, position, obstacles=None, should_stop=None):
+        t0 = time.perf_counter()
+        removed = self.set_obstacles(obstacles) if obstacles is not None else 0
+        self._retarget(position)
+        result = grow(self.graph, self.params, should_stop=should_stop)
+        report = ReplanReport(success=result.success, removed_nodes=removed, nodes=result.nodes,
+                              iterations=result.iterations, collision_checks=result.collision_checks)
+        if result.success:
+            path = result.path[::-1]  # da raiz (alvo) até o drone -> do drone até o alvo
+            report.path = self.postprocess(path) if self.postprocess else path
+        report.latency_s = time.perf_counter() - t0
+        self.reports.append(report)
+        return report
+
+
+def replanner_from_config(config, postprocess=None):
+    return Replanner(config.START_POS, config.GOAL_POS, config.OBSTACLES, PlannerParams.from_config(config),
+                     postprocess)
+
+
+def run_replan_events(replanner, manager, events, cancel_event, speed_cm_s=None, max_attempts=3):
+    """ Dispara os eventos [(segundos_desde_o_início_do_voo, obstáculos_novos), ...] durante o voo: a cada um,
+    replaneja a partir do fim do segmento em voo (manager.replan_origin) e entrega o novo caminho ao executor.
+    Se o caminho chega depois de o drone começar o segmento seguinte, o executor o recusa e o replanejamento
+    é refeito a partir da nova origem. """
+    def worker():
+        t0 = time.monotonic()
+        for at_s, new_obstacles in sorted(events, key=lambda e: e[0]):
+            delay = at_s / manager.time_scale - (time.monotonic() - t0)
+            if cancel_event.wait(max(0.0, delay)): return
+            obstacles = replanner.obstacles + [o for o in new_obstacles if o not in replanner.obstacles]
+            for attempt in range(max_attempts):
+                try:
+                    report = replanner.replan(manager.replan_origin(), obstacles if attempt == 0 else None)
+                except ValueError as e:
+                    print(f"\nReplanejamento impossível: {e}"); break
+                msg = (f"\nReplanejado em {report.latency_s*1000:.1f} ms ({report.removed_nodes} nós podados, "
+                       f"{report.iterations} iterações)")
+                if speed_cm_s: msg += f" ~ {report.latency_s * speed_cm_s:.1f} cm de voo"
+                print(msg)
+                if not report.success:
+                    print("Nenhum caminho encontrado após a mudança; mantendo o plano atual."); break
+                manager.update_path(report.path)
+                accepted = None
+                while accepted is None and not cancel_event.is_set():
+                    accepted = manager.wait_path_update(0.1)
+                if accepted is not False: break
+                print("Caminho replanejado chegou tarde (o drone já seguiu); replanejando da nova origem.")
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
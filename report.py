@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+
+# Relatório de fim de voo: os gráficos 2D, 3D e de velocidade são renderizados em paralelo,
+# cada um em um processo, a partir de um único instantâneo colunar do histórico (arrays NumPy,
+# baratos de enviar aos processos). Tudo usa o backend Agg, sem janela.
+# Modos: "full" (JPG 300 dpi, como antes), "fast" (PNG 100 dpi) e "vector" (SVG).
+# Com cache_dir, um relatório idêntico (mesmos dados e modo) é copiado do cache em vez de re-renderizado.
+
+MODES = {"full": ("jpg", 300), "fast": ("png", 100), "vector": ("svg", None)}
+KINDS = ("2d", "3d", "velocity")
+FILE_PREFIX = {"2d": "trajetoria_final_2d", "3d": "trajetoria_final_3d", "velocity": "velocidade_vs_tempo"}
+COLUMNS = ("t", "x", "y", "z", "speed", "waypoint")
+
+
+def snapshot(records, planned_path, obstacles, width, height, target_altitude):
+    """ Copia uma vez as colunas usadas pelos gráficos (o histórico pode ser um memmap do log). """
+    snap = {f: np.ascontiguousarray(records[f]) for f in COLUMNS}
+    planned = np.asarray(planned_path, dtype=np.float64)
+    snap.update(planned=planned if planned.ndim == 2 else planned.reshape(-1, 2),  # (n, 2) ou (n, 3) em 3D
+                obstacles=[tuple(o) for o in obstacles], width=width, height=height,
+                target_altitude=target_altitude)
+    return snap
+
+
+def snapshot_from_config(records, planned_path, config):
+    return snapshot(records, planned_path, config.OBSTACLES, config.SCREEN_WIDTH, config.SCREEN_HEIGHT,
+                    config.TELLO_TARGET_ALTITUDE)
+
+
+def snapshot_from_log(path):
+    """ Reconstrói o instantâneo a partir de um log de voo salvo (o caminho planejado vai nos metadados). """
+    from flight_log import read_header, load_flight_log
+    _, meta, _ = read_header(path)
+    return snapshot(load_flight_log(path), meta.get("planned_path", []), meta.get("obstacles", []),
+                    meta.get("width", 200), meta.get("height", 200), meta.get("target_altitude", 40))
+
+
+def snapshot_key(snap, mode):
+    h = hashlib.sha1(mode.encode())
+    for f in COLUMNS + ("planned",): h.update(snap[f].tobytes())
+    h.update(repr((snap["obstacles"], snap["width"], snap["height"], snap["target_altitude"])).encode())
+    return h.hexdigest()[:16]
+
+
+def _render_2d(plt, snap):
+    fig, ax = plt.subplots(figsize=(10, 10))
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_title('Resultado Final da Trajetória (2D)')
+    ax.set_xlabel('Eixo X (cm)'); ax.set_ylabel('Eixo Y (cm)')
+    ax.grid(True)
+    ax.set_xlim(0, snap["width"]); ax.set_ylim(0, snap["height"])
+    px, py = snap["planned"][:, 0], snap["planned"][:, 1]
+    ax.plot(px, py, 'r--', label='Caminho Planejado')
+    if len(snap["t"]) > 1:
+        ax.plot(snap["x"], snap["y"], 'b-', label='Caminho Real')
+    ax.plot(px, py, 'ko', markersize=4, label='Nós do RRT')
+    ax.legend()
+    return fig
+
+
+def _render_3d(plt, snap):
+    from mpl_toolkits.mplot3d import Axes3D  # Necessário para o plot 3D
+    fig = plt.figure(figsize=(10, 10))
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_title('Resultado Final da Trajetória (3D)')
+    ax.set_xlabel('Eixo X (cm)'); ax.set_ylabel('Eixo Y (cm)'); ax.set_zlabel('Altitude Z (cm)')
+    ax.set_xlim(0, snap["width"]); ax.set_ylim(0, snap["height"])
+    planned = snap["planned"]
+    px, py = planned[:, 0], planned[:, 1]
+    # Perfil de altitude planejado (3D) ou a altitude fixa de voo (2D)
+    pz = planned[:, 2] if planned.shape[1] > 2 else np.full(len(px), snap["target_altitude"])
+    zmax = max(150, float(pz.max()) + 10) if len(pz) else 150
+    ax.set_zlim(0, zmax)
+    ax.plot(px, py, pz, 'r--', label='Caminho Planejado')
+    for x, y, w, h, *z in snap["obstacles"]:
+        # Obstáculos com altura aparecem como caixas de arame; sem altura, até o teto do gráfico
+        z0, z1 = (0.0, z[0]) if len(z) == 1 else (tuple(z) if z else (0.0, zmax))
+        for zz in (z0, z1):
+            ax.plot([x, x + w, x + w, x, x], [y, y, y + h, y + h, y], [zz] * 5, color='grey', lw=0.8)
+        for cx, cy in ((x, y), (x + w, y), (x + w, y + h), (x, y + h)):
+            ax.plot([cx, cx], [cy, cy], [z0, z1], color='grey', lw=0.8)
+    if len(snap["t"]) > 1:
+        ax.plot(snap["x"], snap["y"], snap["z"], 'b-', label='Caminho Real')
+    ax.legend()
+    return fig
+
+
+def _render_velocity(plt, snap):
+    times, speeds, wps = snap["t"], snap["speed"], snap["waypoint"]
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.set_title('Velocidade do Drone vs. Tempo')
+    ax.set_xlabel('Tempo (s)')
+    ax.set_ylabel('Velocidade (cm/s)')
+    ax.grid(True)
+    ax.plot(times, speeds, '-', label='Velocidade')
+    # Marca cada troca de waypoint (índices onde o waypoint muda), sem laço sobre as amostras
+    changes = np.flatnonzero(np.diff(wps, prepend=-1) != 0)
+    top = float(speeds.max()) * 0.9 if len(speeds) else 0.0
+    for i in changes[wps[changes] > 0]:
+        ax.axvline(x=times[i], color='r', linestyle='--', linewidth=0.8)
+        ax.text(times[i] + 0.1, top, f'WP {wps[i]}', rotation=90, color='r')
+    ax.legend()
+    return fig
+
+
+RENDERERS = {"2d": _render_2d, "3d": _render_3d, "velocity": _render_velocity}
+
+
+def render_one(kind, snap, filename, dpi):
+    """ Renderiza um gráfico com o backend Agg (roda nos processos do pool). """
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+    t0 = time.perf_counter()
+    fig = RENDERERS[kind](plt, snap)
+    if dpi: fig.savefig(filename, dpi=dpi)
+    else: fig.savefig(filename)
+    plt.close(fig)
+    return filename, time.perf_counter() - t0
+
+
+def render_reports(snap, out_dir=".", mode="full", kinds=KINDS, parallel=True, workers=None,
+                   cache_dir=None, timestamp=None):
+    """ Gera os gráficos do relatório e retorna {tipo: arquivo}. """
+    if len(snap["t"]) < 2 and "velocity" in kinds:
+        print("Não há dados de velocidade suficientes para plotar.")
+        kinds = [k for k in kinds if k != "velocity"]
+    ext, dpi = MODES[mode]
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d-%H%M%S")
+    os.makedirs(out_dir, exist_ok=True)
+    files = {k: os.path.join(out_dir, f"{FILE_PREFIX[k]}_{timestamp}.{ext}") for k in kinds}
+
+    todo = dict(files)
+    if cache_dir:
+        key = snapshot_key(snap, mode)
+        cached = {k: os.path.join(cache_dir, f"{key}_{k}.{ext}") for k in kinds}
+        for k in kinds:
+            if os.path.exists(cached[k]):
+                shutil.copyfile(cached[k], files[k]); del todo[k]
+                print(f"Gráfico '{k}' reaproveitado do cache -> '{files[k]}'")
+
+    t0 = time.perf_counter()
+    # Um processo por núcleo no máximo; com um só núcleo (ou um só gráfico) os processos só custam a partida
+    workers = min(workers or len(todo), len(todo), os.cpu_count() or 1)
+    if parallel and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {k: pool.submit(render_one, k, snap, f, dpi) for k, f in todo.items()}
+            done = {k: fut.result() for k, fut in futures.items()}
+    else:
+        done = {k: render_one(k, snap, f, dpi) for k, f in todo.items()}
+    for k, (filename, elapsed) in done.items():
+        print(f"Gráfico '{k}' salvo como '{filename}' ({elapsed:.1f}s)")
+    if done:
+        print(f"Relatório renderizado em {time.perf_counter() - t0:.1f}s")
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        for k in done: shutil.copyfile(files[k], cached[k])
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenera os gráficos de fim de voo a partir de um log salvo.")
+    parser.add_argument("log", help="arquivo .tlog gravado durante o voo")
+    parser.add_argument("--mode", choices=sorted(MODES), default="full")
+    parser.add_argument("--out", default=".", help="pasta de saída")
+    parser.add_argument("--serial", action="store_true", help="renderiza no processo atual, um por vez")
+    parser.add_argument("--cache", default=None, help="pasta de cache dos gráficos")
+    args = parser.parse_args(argv)
+    stamp = os.path.splitext(os.path.basename(args.log))[0]
+    render_reports(snapshot_from_log(args.log), args.out, args.mode, parallel=not args.serial,
+                   cache_dir=args.cache, timestamp=stamp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import heapq
+import math
+import numpy as np
+from node_store import NO_PARENT
+
+# Grafo de estradas (roadmap) não direcionado sobre pontos do mapa: nós em um array NumPy,
+# arestas em listas de adjacência (vizinho, comprimento). Toda aresta inserida já foi
+# verificada contra os obstáculos, então uma consulta é só busca A* no grafo.
+
+
+class Roadmap:
+    def __init__(self):
+        self.coords = np.empty((0, 2), dtype=np.float64)
+        self.adjacency = []
+
+    def __len__(self): return len(self.adjacency)
+
+    @classmethod
+    def from_arrays(cls, coords, edges):
+        """ Reconstrói o grafo a partir de coords (n x 2) e edges (m x 2), p.ex. lidos do disco. """
+        rm = cls()
+        rm.add_nodes(coords)
+        for i, j in np.asarray(edges, dtype=np.int64).reshape(-1, 2).tolist(): rm.add_edge(i, j)
+        return rm
+
+    def edges(self):
+        """ Arestas (i, j) com i < j, como array m x 2. """
+        pairs = [(i, j) for i, adj in enumerate(self.adjacency) for j, _ in adj if i < j]
+        return np.array(pairs, dtype=np.int32).reshape(-1, 2)
+
+    def point(self, i): return tuple(self.coords[i].tolist())
+
+    def add_nodes(self, points):
+        """ Acrescenta vários nós de uma vez; retorna o índice do primeiro. """
+        first = len(self)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.coords = np.vstack([self.coords, points])
+        self.adjacency.extend([] for _ in range(len(points)))
+        return first
+
+    def truncate(self, n):
+        """ Remove os nós de índice >= n (e as arestas deles), p.ex. pontos de uma consulta. """
+        for i in range(n, len(self)):
+            for j, _ in self.adjacency[i]:
+                if j < n: self.adjacency[j] = [e for e in self.adjacency[j] if e[0] < n]
+        del self.adjacency[n:]
+        self.coords = self.coords[:n]
+
+    def add_edge(self, i, j):
+        d = float(np.hypot(*(self.coords[i] - self.coords[j])))
+        self.adjacency[i].append((j, d)); self.adjacency[j].append((i, d))
+
+    def add_tree(self, graph):
+        """ Incorpora as arestas de uma árvore RRT (nó -> pai). Retorna o intervalo de índices novos. """
+        first = self.add_nodes(np.column_stack([graph.x, graph.y]))
+        for i, p in enumerate(graph.parent.tolist()):
+            if p != NO_PARENT: self.add_edge(first + i, first + p)
+        return first, len(self)
+
+    def neighbours(self, point, radius, k=None, exclude_from=None):
+        """ Índices dos nós a até radius do ponto, do mais próximo ao mais distante. """
+        limit = len(self) if exclude_from is None else exclude_from
+        if limit == 0: return []
+        d = np.hypot(*(self.coords[:limit] - np.asarray(point, dtype=np.float64)).T)
+        idx = np.flatnonzero(d <= radius)
+        idx = idx[np.argsort(d[idx])]
+        return idx[:k].tolist() if k else idx.tolist()
+
+    def link(self, first, last, radius, collides, k=5):
+        """ Liga os nós [first, last) aos k vizinhos mais antigos (índice < first) cuja aresta é livre,
+        unindo componentes de árvores diferentes. Retorna o número de arestas criadas. """
+        added = 0
+        for i in range(first, last):
+            p = self.point(i)
+            for j in self.neighbours(p, radius, k, exclude_from=first):
+                if not collides(*p, *self.point(j)):
+                    self.add_edge(i, j); added += 1
+        return added
+
+    def connect(self, point, radius, collides, k=10):
+        """ Insere o ponto e o liga aos vizinhos visíveis; retorna o índice, ou None se nenhum é visível. """
+        candidates = [j for j in self.neighbours(point, radius, k) if not collides(*point, *self.point(j))]
+        if not candidates: return None
+        i = self.add_nodes([point])
+        for j in candidates: self.add_edge(i, j)
+        return i
+
+    def shortest_path(self, a, b):
+        """ A* com heurística euclidiana; retorna a lista de índices de a até b ou None. """
+        hv = np.hypot(*(self.coords - self.coords[b]).T).tolist()  # heurística de todos os nós de uma vez
+        h = hv.__getitem__
+        best = {a: 0.0}
+        came = {a: None}
+        heap = [(h(a), a)]
+        closed = set()
+        while heap:
+            _, i = heapq.heappop(heap)
+            if i == b:
+                path = []
+                while i is not None: path.append(i); i = came[i]
+                return path[::-1]
+            if i in closed: continue
+            closed.add(i)
+            for j, d in self.adjacency[i]:
+                c = best[i] + d
+                if c < best.get(j, math.inf):
+                    best[j], came[j] = c, i
+                    heapq.heappush(heap, (c + h(j), j))
+        return None
+
+    def query(self, start, goal, radius, collides, k=10):
+        """ Caminho (lista de pontos) entre dois pontos quaisquer pelo roadmap, ou None. """
+        if not len(self): return None
+        a = self.connect(start, radius, collides, k)
+        b = self.connect(goal, radius, collides, k) if a is not None else None
+        if b is None: return None
+        idx = self.shortest_path(a, b)
+        return [self.point(i) for i in idx] if idx else None
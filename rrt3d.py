@@ -0,0 +1,65 @@
+import math
+from geometry import inflate_box3, point_in_box3, segment_intersects_box3
+from node_store import NO_PARENT
+from rrt_planner import RRTGraph
+
+
+class RRTGraph3D(RRTGraph):
+    """ RRT em (x, y, z): mesmo NodeStore e índices espaciais com dims=3, amostragem da altitude
+    entre z_min e z_max e colisão contra caixas 3D (obstáculos com altura, ver geometry.z_range).
+    O RRTGraph 2D continua sendo o caminho rápido quando a altitude é fixa. """
+    dims = 3
+
+    def __init__(self, start, goal, map_dimensions, obstacles, z_bounds=(20, 150), obstacle_margin=0, **kwargs):
+        self.z_min, self.z_max = z_bounds
+        self.boxes3 = [inflate_box3(obs, obstacle_margin) for obs in obstacles]
+        super().__init__(start, goal, map_dimensions, obstacles, obstacle_margin=obstacle_margin, **kwargs)
+        # A grade de ocupação é 2D; em 3D a colisão é sempre pelas caixas
+        self.occupancy, self.grid_collision = None, False
+
+    def distance(self, i, j): return math.dist(self.nodes.point(i), self.nodes.point(j))
+
+    def sample_point(self, safety_margin):
+        x, y = super().sample_point(safety_margin)
+        return x, y, self.rng.uniform(self.z_min, self.z_max)
+
+    def nearest_to(self, x, y, z): return self.index.nearest((x, y, z))
+
+    def is_free(self, x, y, z):
+        if not self.z_min <= z <= self.z_max: return False
+        return not any(point_in_box3(x, y, z, box) for box in self.boxes3)
+
+    def crosses_obstacle(self, x1, y1, z1, x2, y2, z2):
+        self.collision_checks += 1
+        return any(segment_intersects_box3(x1, y1, z1, x2, y2, z2, box) for box in self.boxes3)
+
+    def add_node(self, x, y, z, parent_idx=NO_PARENT, cost=0.0):
+        idx = self.nodes.add((x, y, z), parent_idx, cost)
+        self.index.insert(idx, (x, y, z))
+        return idx
+
+    def steer(self, near, x, y, z, maxd, snap=True):
+        p = self.nodes.point(near)
+        q = (x, y, z)
+        d = math.dist(p, q)
+        if d > maxd:
+            q = tuple(pi + (qi - pi) * maxd / d for pi, qi in zip(p, q))
+        if snap and math.dist(q, self.goal) < maxd:
+            return (*self.goal, True)
+        return (*q, False)
+
+    def try_extend(self, x, y, z, maxd, snap=True):
+        near = self.nearest_to(x, y, z)
+        nx, ny, nz, reached = self.steer(near, x, y, z, maxd, snap)
+        if self.crosses_obstacle(*self.nodes.point(near), nx, ny, nz): return None
+        idx = self.add_node(nx, ny, nz, near)
+        if reached: self.goal_flag, self.goal_state = True, idx
+        return idx, near
+
+    def expand(self, step_size, safety_margin):
+        p = self.sample_point(safety_margin)
+        if not self.is_free(*p): return None
+        return self.try_extend(*p, step_size)
+
+    def bias(self, step_size):
+        return self.try_extend(*self.goal, step_size)
@@ -0,0 +1,67 @@
+from rrt_planner import RRTGraph
+
+
+class RRTConnect:
+    """ RRT-Connect bidirecional: uma árvore parte do início, outra do alvo, e a cada
+    iteração a árvore que cresceu tenta se ligar à outra de forma gulosa.
+    Expõe a mesma interface que o plan() usa do RRTGraph (expand/bias/goal_flag/...). """
+    def __init__(self, start, goal, map_dimensions, obstacles, on_edge=None, **kwargs):
+        self.start, self.goal = start, goal
+        self.tree_start = RRTGraph(start, goal, map_dimensions, obstacles, **kwargs)
+        self.tree_goal = RRTGraph(goal, start, map_dimensions, obstacles, **kwargs)
+        self.trees = (self.tree_start, self.tree_goal)
+        self.on_edge = on_edge
+        self.goal_flag, self.path_coords = False, []
+        self._grow_start = True
+
+    def number_of_nodes(self): return sum(t.number_of_nodes() for t in self.trees)
+
+    @property
+    def collision_checks(self): return sum(t.collision_checks for t in self.trees)
+
+    def _extend(self, tree, x, y, maxd):
+        """ Um passo em direção a (x, y), sem encaixe no alvo. Retorna (idx, alcançou) ou None. """
+        edge = tree.try_extend(x, y, maxd, snap=False)
+        if edge is None: return None
+        idx, near = edge
+        if self.on_edge: self.on_edge(tree, idx, near)
+        return idx, tree.nodes.point(idx) == (x, y)
+
+    def _connect(self, tree, x, y, maxd):
+        """ Estende a árvore repetidamente até alcançar (x, y) ou bater em um obstáculo. """
+        while True:
+            step = self._extend(tree, x, y, maxd)
+            if step is None: return None
+            idx, reached = step
+            if reached: return idx
+
+    def expand(self, step_size, safety_margin):
+        a, b = (self.tree_start, self.tree_goal) if self._grow_start else (self.tree_goal, self.tree_start)
+        self._grow_start = not self._grow_start
+        xr, yr = a.sample_point(safety_margin)
+        if not a.is_free(xr, yr): return None
+        step = self._extend(a, xr, yr, step_size)
+        if step is None: return None
+        idx_a = step[0]
+        idx_b = self._connect(b, *a.nodes.point(idx_a), step_size)
+        if idx_b is not None:
+            self._join(a, idx_a, b, idx_b)
+        return None  # as arestas já foram reportadas via on_edge
+
+    def bias(self, step_size):
+        """ Viés para o alvo: conexão gulosa da árvore do início até a raiz da outra árvore. """
+        idx = self._connect(self.tree_start, self.goal[0], self.goal[1], step_size)
+        if idx is not None:
+            self._join(self.tree_start, idx, self.tree_goal, 0)
+        return None
+
+    def _join(self, a, idx_a, b, idx_b):
+        path_a = [a.nodes.point(i) for i in a.path_to(idx_a)]
+        path_b = [b.nodes.point(i) for i in b.path_to(idx_b)]
+        if a is self.tree_goal: path_a, path_b = path_b, path_a
+        # O ponto de encontro aparece nas duas metades
+        self.path_coords = path_a + path_b[::-1][1:]
+        self.goal_flag = True
+
+    def path_to_goal(self): return self.goal_flag
+    def get_path_coords(self): return list(self.path_coords)
@@ -1,206 +1,320 @@
-from datetime import datetime
-import pygame
 import math
 import random
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from nn_index import make_index
+from node_store import NodeStore, NO_PARENT
+import instrumentation
+from geometry import inflate_box, point_in_box, segment_intersects_box, segment_intersects_box_sampled
 
-SCALE_FACTOR = 5
 
-class RRTMap:
-    def __init__(self, start, goal, map_dimensions):
-        self.start, self.goal = start, goal
-        self.map_h, self.map_w = map_dimensions
-        
-        # Janela de visualização em tempo real (tamanho normal)
-        pygame.display.set_caption('RRT Path Planning')
-        self.map = pygame.display.set_mode((self.map_w, self.map_h))
-        self.map.fill((255, 255, 255))
-
-        # Superfície de alta resolução para salvar (invisível)
-        self.hires_w = self.map_w * SCALE_FACTOR
-        self.hires_h = self.map_h * SCALE_FACTOR
-        self.hires_map = pygame.Surface((self.hires_w, self.hires_h))
-        self.hires_map.fill((255, 255, 255))
-
-        # Ajusta o tamanho dos elementos visuais
-        self.node_rad = 2
-        self.edge_thickness = 1
-        
-        # Cores
-        self.grey, self.blue, self.green, self.red = (70, 70, 70), (0, 0, 255), (0, 255, 0), (255, 0, 0)
-
-    def draw_map(self, obstacles):
-        # Desenha na superfície de alta resolução (com escala)
-        pygame.draw.circle(self.hires_map, self.green, (self.start[0]*SCALE_FACTOR, self.start[1]*SCALE_FACTOR), (self.node_rad + 5)*SCALE_FACTOR)
-        pygame.draw.circle(self.hires_map, self.red, (self.goal[0]*SCALE_FACTOR, self.goal[1]*SCALE_FACTOR), (self.node_rad + 15)*SCALE_FACTOR, 3*SCALE_FACTOR)
-        for obs in obstacles:
-            scaled_obs = pygame.Rect(obs.x*SCALE_FACTOR, obs.y*SCALE_FACTOR, obs.w*SCALE_FACTOR, obs.h*SCALE_FACTOR)
-            pygame.draw.rect(self.hires_map, self.grey, scaled_obs)
-        
-        # Copia a versão de alta resolução para a tela, ajustando o tamanho
-        scaled_down_map = pygame.transform.smoothscale(self.hires_map, (self.map_w, self.map_h))
-        self.map.blit(scaled_down_map, (0, 0))
-
-    def draw_path(self, path_coords):
-        # Desenha o caminho final na superfície de alta resolução
-        for x, y in path_coords:
-            pygame.draw.circle(self.hires_map, self.red, (x*SCALE_FACTOR, y*SCALE_FACTOR), (self.node_rad + 3)*SCALE_FACTOR)
-
-    def draw_tree_updates(self, x, y, parent_x, parent_y):
-        # Desenha o crescimento da árvore na superfície de alta resolução
-        pos = (x*SCALE_FACTOR, y*SCALE_FACTOR)
-        parent_pos = (parent_x*SCALE_FACTOR, parent_y*SCALE_FACTOR)
-        pygame.draw.circle(self.hires_map, self.blue, pos, self.node_rad*SCALE_FACTOR)
-        pygame.draw.line(self.hires_map, self.blue, pos, parent_pos, self.edge_thickness*SCALE_FACTOR)
-        
-    def update_display(self):
-        # Atualiza a janela de visualização com a versão em alta resolução
-        scaled_down_map = pygame.transform.smoothscale(self.hires_map, (self.map_w, self.map_h))
-        self.map.blit(scaled_down_map, (0, 0))
-        pygame.display.update()
+@dataclass
+class PlannerParams:
+    """ Parâmetros do planejador, independentes de qualquer interface gráfica. """
+    width: int = 200
+    height: int = 200
+    max_iterations: int = 2000
+    step_size: float = 35
+    safety_margin: int = 20
+    obstacle_margin: float = 0
+    nn_index: str = "kdtree"
+    collision: str = "exact"  # "exact" (Liang–Barsky), "grid" (campo de distância) ou "sampled" (101 pontos, só para comparação)
+    occupancy_resolution: float = None  # cm por célula da grade de ocupação; None = sem grade
+    occupancy_cache_dir: str = ".cache/occupancy"
+    goal_bias_every: int = 10  # a cada N iterações tenta ligar direto ao alvo
+    mode: str = "rrt"  # "rrt", "rrt_star", "informed_rrt_star", "rrt_connect" ou "prm"
+    time_budget_s: float = None  # orçamento de tempo (modos anytime continuam até esgotá-lo)
+    rewire_gamma: float = 1.0  # escala do raio de vizinhança do RRT*
+    seed: int = None  # semente do gerador do planejador (None = não reproduzível)
+    dims: int = 2  # 3 = planejamento em (x, y, z), só no modo "rrt"
+    z_min: float = 20  # limites de altitude do planejamento 3D (cm)
+    z_max: float = 150
+    default_altitude: float = 40  # altitude de início/alvo 3D dados só como (x, y)
+    prm_samples: int = 500  # modo "prm": amostras livres do roadmap
+    prm_radius: float = None  # raio de ligação entre amostras (None = 1.5 * step_size)
+    prm_neighbours: int = 10  # no máximo k vizinhos por amostra
+    prm_cache_dir: str = ".cache/prm"  # None = só em memória
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(width=config.SCREEN_WIDTH, height=config.SCREEN_HEIGHT,
+                   max_iterations=config.RRT_MAX_ITERATIONS, step_size=config.RRT_STEP_SIZE,
+                   safety_margin=config.SAFETY_MARGIN_CM, obstacle_margin=config.OBSTACLE_MARGIN_CM,
+                   nn_index=config.RRT_NN_INDEX, mode=config.RRT_MODE,
+                   time_budget_s=config.RRT_TIME_BUDGET_S, seed=config.PLANNER_SEED,
+                   collision="grid" if config.OCCUPANCY_GRID else "exact",
+                   occupancy_resolution=config.OCCUPANCY_RESOLUTION_CM if config.OCCUPANCY_GRID else None,
+                   occupancy_cache_dir=config.OCCUPANCY_CACHE_DIR,
+                   prm_samples=config.PRM_SAMPLES, prm_radius=config.PRM_RADIUS_CM,
+                   prm_cache_dir=config.PRM_CACHE_DIR, dims=config.PLANNER_DIMS,
+                   z_min=config.ALTITUDE_MIN_CM, z_max=config.ALTITUDE_MAX_CM,
+                   default_altitude=config.TELLO_TARGET_ALTITUDE)
+
+
+@dataclass
+class PlanResult:
+    """ Resultado de uma execução do planejador. """
+    path: list = field(default_factory=list)
+    success: bool = False
+    cancelled: bool = False
+    iterations: int = 0
+    nodes: int = 0
+    elapsed_s: float = 0.0
+    collision_checks: int = 0
+    time_to_first_s: float = None
+    cost: float = None
+    seed: int = None
+    graph: object = None
+
+
+class PlanObserver:
+    """ Observador opcional do planejamento. Todos os ganchos são opcionais. """
+    def on_start(self, graph): pass
+    def on_edge(self, graph, idx, near): pass
+    def on_iteration(self, i, graph):
+        """ Retornar False cancela o planejamento. """
+        return True
+    def on_finish(self, result): pass
 
 
 class RRTGraph:
-    def __init__(self, start, goal, map_dimensions, obstacles):
+    track_cost = False  # subclasses que precisam do custo por nó (RRT*) ligam isto
+    dims = 2  # o RRTGraph3D (rrt3d.py) usa 3
+
+    def __init__(self, start, goal, map_dimensions, obstacles, nn_index="kdtree", cell_size=35, obstacle_margin=0,
+                 capacity=1024, rng=None, collision="exact", occupancy=None):
         self.start, self.goal = start, goal
+        # Gerador próprio: execuções com a mesma semente são reproduzíveis e independentes entre si
+        self.rng = rng or random.Random()
         self.map_h, self.map_w = map_dimensions
         self.obstacles = obstacles
-        self.x, self.y, self.parent = [start[0]], [start[1]], [None]
+        # Caixas infladas pela margem, calculadas uma única vez por mapa
+        self.boxes = [inflate_box(obs, obstacle_margin) for obs in obstacles]
+        self.segment_test = segment_intersects_box_sampled if collision == "sampled" else segment_intersects_box
+        self.collision_checks = 0
+        # Grade de ocupação opcional: is_free O(1) e, com collision="grid", checagem de aresta pelo campo de distância
+        self.occupancy = occupancy
+        self.grid_collision = collision == "grid" and occupancy is not None
+        self.nodes = NodeStore(dims=self.dims, capacity=capacity, with_cost=self.track_cost)
         self.goal_flag, self.goal_state, self.path = False, None, []
+        # Índice espacial mantido em sincronia por add_node/remove_last
+        self.index_kind, self.cell_size = nn_index, cell_size
+        self.index = make_index(nn_index, cell_size, dims=self.dims, store=self.nodes)
+        self.add_node(*start[:self.dims], NO_PARENT)
 
-    def number_of_nodes(self): return len(self.x)
-    def distance(self, i, j): return math.hypot(self.x[i] - self.x[j], self.y[i] - self.y[j])
+    # Visões (sem cópia) das colunas do NodeStore
+    @property
+    def x(self): return self.nodes.coords[:self.nodes.n, 0]
+    @property
+    def y(self): return self.nodes.coords[:self.nodes.n, 1]
+    @property
+    def parent(self): return self.nodes.parent[:self.nodes.n]
+
+    def number_of_nodes(self): return len(self.nodes)
+    def distance(self, i, j):
+        (x1, y1), (x2, y2) = self.nodes.point(i), self.nodes.point(j)
+        return math.hypot(x1 - x2, y1 - y2)
     
     def sample_point(self, safety_margin):
         """ Sorteia um ponto aleatório DENTRO da margem de segurança. """
-        x = random.randint(safety_margin, self.map_w - safety_margin)
-        y = random.randint(safety_margin, self.map_h - safety_margin)
+        x = self.rng.randint(safety_margin, self.map_w - safety_margin)
+        y = self.rng.randint(safety_margin, self.map_h - safety_margin)
         return x, y
 
-    def nearest(self, idx):
-        best, dmin = 0, self.distance(0, idx)
-        for i in range(1, idx):
-            d = self.distance(i, idx)
-            if d < dmin: dmin, best = d, i
-        return best
+    def nearest_to(self, x, y): return self.index.nearest((x, y))
+    def nearest(self, idx): return self.index.nearest(self.nodes.point(idx), exclude=idx)
 
-    def is_free(self, x, y): return all(not obs.collidepoint(x, y) for obs in self.obstacles)
+    def is_free(self, x, y):
+        if self.occupancy is not None: return self.occupancy.is_free(x, y)
+        return not any(point_in_box(x, y, box) for box in self.boxes)
     
     def crosses_obstacle(self, x1, y1, x2, y2):
-        for obs in self.obstacles:
-            for t in [i / 100 for i in range(101)]:
-                x, y = x1 + t * (x2 - x1), y1 + t * (y2 - y1)
-                if obs.collidepoint(x, y): return True
-        return False
+        self.collision_checks += 1
+        if self.grid_collision: return not self.occupancy.segment_free(x1, y1, x2, y2)
+        test = self.segment_test
+        return any(test(x1, y1, x2, y2, box) for box in self.boxes)
 
-    def add_node(self, x, y, parent_idx):
-        self.x.append(x); self.y.append(y); self.parent.append(parent_idx)
-        return self.number_of_nodes() - 1
+    def add_node(self, x, y, parent_idx, cost=0.0):
+        idx = self.nodes.add((x, y), parent_idx, cost)
+        self.index.insert(idx, (x, y))
+        return idx
 
-    def remove_last(self): self.x.pop(); self.y.pop(); self.parent.pop()
-    
-    def step(self, near, idx, maxd):
-        dx, dy = self.x[idx] - self.x[near], self.y[idx] - self.y[near]
-        dist = math.hypot(dx, dy)
-        if dist > maxd:
+    def remove_last(self):
+        if self.goal_state == self.number_of_nodes() - 1:
+            self.goal_flag, self.goal_state = False, None
+        self.nodes.pop(); self.index.pop()
+
+    def subtree_mask(self, roots):
+        """ Máscara dos nós em roots e de todos os seus descendentes (propagação vetorizada pelos pais). """
+        mask = np.asarray(roots, dtype=bool).copy()
+        parent = self.parent
+        has_parent = parent >= 0
+        while True:
+            grown = mask.copy()
+            grown[has_parent] |= mask[parent[has_parent]]
+            if (grown == mask).all(): return mask
+            mask = grown
+
+    def prune(self, invalid):
+        """ Remove os nós marcados e suas subárvores, renumera e reconstrói o índice espacial.
+        Retorna quantos nós foram removidos. """
+        removed = self.subtree_mask(invalid)
+        if not removed.any(): return 0
+        remap = self.nodes.compact(~removed)
+        self.index = make_index(self.index_kind, self.cell_size, dims=self.dims, store=self.nodes)
+        for i in range(self.number_of_nodes()): self.index.insert(i, self.nodes.point(i))
+        if self.goal_state is not None and remap[self.goal_state] < 0:
+            self.goal_flag, self.goal_state = False, None
+        elif self.goal_state is not None:
+            self.goal_state = int(remap[self.goal_state])
+        self.path = []
+        return int(removed.sum())
+
+    def steer(self, near, x, y, maxd, snap=True):
+        """ Nó tentativo: limita (x, y) a maxd a partir de near e (com snap) encaixa no alvo se estiver perto.
+        Não altera a árvore; retorna (x, y, chegou_no_alvo). """
+        nx, ny = self.nodes.point(near)
+        dx, dy = x - nx, y - ny
+        if math.hypot(dx, dy) > maxd:
             theta = math.atan2(dy, dx)
-            self.x[idx], self.y[idx] = int(self.x[near] + maxd * math.cos(theta)), int(self.y[near] + maxd * math.sin(theta))
-        self.parent[idx] = near
-        if math.hypot(self.x[idx] - self.goal[0], self.y[idx] - self.goal[1]) < maxd:
-            self.x[idx], self.y[idx] = self.goal
-            self.goal_flag, self.goal_state = True, idx
-        return idx
-    
-    def connect(self, near, idx):
-        if self.crosses_obstacle(self.x[near], self.y[near], self.x[idx], self.y[idx]):
-            node_idx_to_remove = self.number_of_nodes() - 1
-            if self.goal_state == node_idx_to_remove:
-                self.goal_flag = False
-                self.goal_state = None
-            self.remove_last()
-            return False
-        return True
+            x, y = int(nx + maxd * math.cos(theta)), int(ny + maxd * math.sin(theta))
+        if snap and math.hypot(x - self.goal[0], y - self.goal[1]) < maxd:
+            return self.goal[0], self.goal[1], True
+        return x, y, False
+
+    def try_extend(self, x, y, maxd, snap=True):
+        """ Cresce a árvore em direção a (x, y); só insere o nó se a aresta for livre. """
+        near = self.nearest_to(x, y)
+        nx, ny, reached = self.steer(near, x, y, maxd, snap)
+        nxp, nyp = self.nodes.point(near)
+        if self.crosses_obstacle(nxp, nyp, nx, ny): return None
+        idx = self.add_node(nx, ny, near)
+        if reached: self.goal_flag, self.goal_state = True, idx
+        return idx, near
 
     # ATUALIZADO: O método expand agora aceita a margem de segurança
     def expand(self, step_size, safety_margin):
         xr, yr = self.sample_point(safety_margin)
         if not self.is_free(xr, yr): return None
-        idx = self.add_node(xr, yr, None)
-        near = self.nearest(idx)
-        self.step(near, idx, maxd=step_size)
-        if self.connect(near, idx): return idx, near
-        return None
+        return self.try_extend(xr, yr, step_size)
 
     def bias(self, step_size):
-        idx = self.add_node(self.goal[0], self.goal[1], None)
-        near = self.nearest(idx)
-        self.step(near, idx, maxd=step_size)
-        if self.connect(near, idx): return idx, near
-        return None
+        return self.try_extend(self.goal[0], self.goal[1], step_size)
+
+    def path_to(self, idx):
+        """ Índices dos nós da raiz até idx. """
+        path, node = [], idx
+        while node != NO_PARENT:
+            path.append(node)
+            node = int(self.nodes.parent[node])
+        path.reverse()
+        return path
 
     def path_to_goal(self):
         if not self.goal_flag or self.goal_state is None: return False
-        self.path, node = [], self.goal_state
-        while node is not None:
-            self.path.append(node)
-            node = self.parent[node]
-        self.path.reverse()
+        self.path = self.path_to(self.goal_state)
         return True
 
-    def get_path_coords(self): return [(self.x[i], self.y[i]) for i in self.path]
+    def get_path_coords(self): return [self.nodes.point(i) for i in self.path]
 
-def find_rrt_path(config):
-    pygame.init()
-    clock = pygame.time.Clock()
-    
-    dims = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
-    rrt_map = RRTMap(config.START_POS, config.GOAL_POS, dims)
-    graph = RRTGraph(config.START_POS, config.GOAL_POS, dims, config.OBSTACLES)
-    rrt_map.draw_map(config.OBSTACLES)
-
-    for i in range(config.RRT_MAX_ITERATIONS):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit(); return None, None
-
-        # ATUALIZADO: A chamada para expand agora passa a margem de segurança
-        if i % 10 == 0:
-            result = graph.bias(config.RRT_STEP_SIZE)
+
+def path_length(path):
+    return sum(math.dist(p, q) for p, q in zip(path, path[1:]))
+
+
+# Métodos cronometrados quando a instrumentação está ligada (instrumentation.wrap)
+HOT_PATH = ("expand", "bias", "nearest", "nearest_to", "crosses_obstacle")
+
+
+def make_graph(start, goal, obstacles, params, observer=None):
+    """ Cria o grafo adequado ao modo escolhido em params.mode. """
+    graph = _make_graph(start, goal, obstacles, params, observer)
+    for tree in getattr(graph, "trees", ()):  # RRT-Connect: as duas árvores também
+        instrumentation.wrap(tree, HOT_PATH, "rrt.")
+    return instrumentation.wrap(graph, HOT_PATH, "rrt.")
+
+
+def _make_graph(start, goal, obstacles, params, observer=None):
+    occupancy = None
+    # A grade é 2D: o grafo 3D checa as caixas com a altura delas e não a usaria
+    if params.occupancy_resolution and params.dims != 3:
+        from occupancy import load_or_build
+        occupancy = load_or_build(obstacles, params.width, params.height, params.occupancy_resolution,
+                                  params.obstacle_margin, params.occupancy_cache_dir)
+    kwargs = dict(nn_index=params.nn_index, cell_size=params.step_size, obstacle_margin=params.obstacle_margin,
+                  rng=random.Random(params.seed), collision=params.collision, occupancy=occupancy)
+    dims = (params.height, params.width)
+    if params.dims == 3:
+        if params.mode != "rrt":
+            raise ValueError(f"O planejamento 3D só está disponível no modo 'rrt' (pedido: {params.mode!r})")
+        from rrt3d import RRTGraph3D
+        lift = lambda p: tuple(p) if len(p) == 3 else (p[0], p[1], params.default_altitude)
+        return RRTGraph3D(lift(start), lift(goal), dims, obstacles, z_bounds=(params.z_min, params.z_max), **kwargs)
+    if params.mode == "rrt":
+        return RRTGraph(start, goal, dims, obstacles, **kwargs)
+    if params.mode in ("rrt_star", "informed_rrt_star"):
+        from rrt_star import RRTStarGraph
+        return RRTStarGraph(start, goal, dims, obstacles, informed=params.mode == "informed_rrt_star",
+                            gamma=params.rewire_gamma, **kwargs)
+    if params.mode == "rrt_connect":
+        from rrt_connect import RRTConnect
+        return RRTConnect(start, goal, dims, obstacles, on_edge=observer.on_edge if observer else None, **kwargs)
+    raise ValueError(f"Modo de planejamento desconhecido: {params.mode!r}")
+
+
+def plan(start, goal, obstacles, params=None, observer=None, should_stop=None, stop_check_every=64):
+    """ Executa o planejador sem nenhuma dependência gráfica e sem limitar a taxa de quadros.
+    No modo "rrt" para na primeira solução; nos modos RRT* continua refinando (anytime)
+    até max_iterations ou time_budget_s. should_stop (p.ex. Event.is_set) é consultado
+    a cada stop_check_every iterações e interrompe mantendo a melhor solução até ali. """
+    params = params or PlannerParams()
+    observer = observer or PlanObserver()
+    if params.mode == "prm":
+        from prm import plan_prm
+        result = plan_prm(start, goal, obstacles, params)
+        observer.on_finish(result)
+        return result
+    graph = make_graph(start, goal, obstacles, params, observer)
+    return grow(graph, params, observer, should_stop, stop_check_every)
+
+
+def grow(graph, params, observer=None, should_stop=None, stop_check_every=64):
+    """ Laço de expansão do plan() sobre um grafo já existente (novo ou reaproveitado pelo replanejamento). """
+    observer = observer or PlanObserver()
+    anytime = params.mode in ("rrt_star", "informed_rrt_star")
+    result = PlanResult(graph=graph, seed=params.seed)
+    checks0 = graph.collision_checks
+    observer.on_start(graph)
+    t0 = time.perf_counter()
+
+    for i in range(params.max_iterations):
+        if observer.on_iteration(i, graph) is False:
+            result.cancelled = True; break
+        if should_stop is not None and i % stop_check_every == 0 and should_stop():
+            result.cancelled = True; break
+        if params.time_budget_s is not None and time.perf_counter() - t0 > params.time_budget_s:
+            break
+        if graph.goal_flag and not anytime:
+            break  # árvore reaproveitada que já alcança o alvo
+        result.iterations = i + 1
+
+        if i % params.goal_bias_every == 0:
+            edge = graph.bias(params.step_size)
         else:
-            result = graph.expand(config.RRT_STEP_SIZE, config.SAFETY_MARGIN_CM)
-        
-        if result:
-            last, near = result
-            rrt_map.draw_tree_updates(graph.x[last], graph.y[last], graph.x[near], graph.y[near])
-        
-        if graph.goal_flag:
-            print(f"Caminho encontrado na iteração {i}!")
-            graph.path_to_goal()
-            path = graph.get_path_coords()
-            rrt_map.draw_path(path)
-            rrt_map.update_display()
-            
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            filename = f"rrt_plan_inicial_{timestamp}.png"
-            pygame.image.save(rrt_map.hires_map, filename)
-            print(f"Plano do RRT salvo como '{filename}'")
-            
-            pygame.display.set_caption("Caminho Encontrado! Pressione ESPAÇO para continuar.")
-            waiting = True
-            while waiting:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit(); return None, None
-                    if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                        waiting = False
-                clock.tick(30)
-            
-            return rrt_map, path
-        
-        if i % 5 == 0:
-            rrt_map.update_display()
-
-        clock.tick(60)
-
-    print("Caminho não encontrado dentro do limite de iterações.")
-    pygame.quit()
-    return None, None
\ No newline at end of file
+            edge = graph.expand(params.step_size, params.safety_margin)
+        if edge:
+            observer.on_edge(graph, *edge)
+
+        if graph.goal_flag and result.time_to_first_s is None:
+            result.time_to_first_s = time.perf_counter() - t0
+            if not anytime: break
+
+    if graph.path_to_goal():
+        result.path, result.success = graph.get_path_coords(), True
+        result.cost = path_length(result.path)
+    result.elapsed_s = time.perf_counter() - t0
+    result.nodes = graph.number_of_nodes()
+    result.collision_checks = graph.collision_checks - checks0
+    observer.on_finish(result)
+    return result
@@ -0,0 +1,132 @@
+import math
+import numpy as np
+from node_store import NO_PARENT
+from rrt_planner import RRTGraph
+
+
+class RRTStarGraph(RRTGraph):
+    """ RRT* com escolha de pai e religação da vizinhança; com informed=True, depois
+    da primeira solução passa a amostrar só dentro da elipse que pode melhorar o custo. """
+    track_cost = True
+
+    def __init__(self, start, goal, map_dimensions, obstacles, informed=False, gamma=1.0, **kwargs):
+        self.children = []  # preenchido por add_node, inclusive para a raiz criada no super().__init__
+        super().__init__(start, goal, map_dimensions, obstacles, **kwargs)
+        self.informed = informed
+        # Constante do raio de vizinhança (Karaman & Frazzoli) para 2D, escalada pela área do mapa
+        self.gamma = gamma * 2 * math.sqrt(1.5) * math.sqrt(self.map_w * self.map_h / math.pi)
+        self.c_min = math.hypot(goal[0] - start[0], goal[1] - start[1])
+        self.rewires = 0
+
+    @property
+    def best_cost(self):
+        return float(self.nodes.cost[self.goal_state]) if self.goal_flag else math.inf
+
+    def near_radius(self, maxd):
+        n = self.number_of_nodes() + 1
+        return min(self.gamma * math.sqrt(math.log(n) / n), maxd)
+
+    def add_node(self, x, y, parent_idx, cost=0.0):
+        idx = super().add_node(x, y, parent_idx, cost)
+        self.children.append([])
+        if parent_idx != NO_PARENT: self.children[parent_idx].append(idx)
+        return idx
+
+    def remove_last(self):
+        idx = self.number_of_nodes() - 1
+        p = int(self.nodes.parent[idx])
+        if p != NO_PARENT: self.children[p].remove(idx)
+        self.children.pop()
+        super().remove_last()
+
+    def prune(self, invalid):
+        removed = super().prune(invalid)
+        if removed:
+            self.children = [[] for _ in range(self.number_of_nodes())]
+            for i, p in enumerate(self.parent.tolist()):
+                if p != NO_PARENT: self.children[p].append(i)
+        return removed
+
+    def _reparent(self, idx, new_parent, new_cost):
+        """ Troca o pai de idx e propaga a variação de custo para toda a subárvore. """
+        old = int(self.nodes.parent[idx])
+        self.children[old].remove(idx)
+        self.children[new_parent].append(idx)
+        self.nodes.parent[idx] = new_parent
+        delta = new_cost - float(self.nodes.cost[idx])
+        stack = [idx]
+        while stack:
+            node = stack.pop()
+            self.nodes.cost[node] += delta
+            stack.extend(self.children[node])
+        self.rewires += 1
+
+    def sample_point(self, safety_margin):
+        if not (self.informed and self.goal_flag):
+            return super().sample_point(safety_margin)
+        # Amostragem informada: disco unitário -> elipse com focos no início e no alvo
+        c_best = self.best_cost
+        r1 = c_best / 2
+        r2 = math.sqrt(max(c_best ** 2 - self.c_min ** 2, 0.0)) / 2
+        cx, cy = (self.start[0] + self.goal[0]) / 2, (self.start[1] + self.goal[1]) / 2
+        theta = math.atan2(self.goal[1] - self.start[1], self.goal[0] - self.start[0])
+        cos_t, sin_t = math.cos(theta), math.sin(theta)
+        for _ in range(20):
+            rho, phi = math.sqrt(self.rng.random()), self.rng.uniform(0, 2 * math.pi)
+            ex, ey = r1 * rho * math.cos(phi), r2 * rho * math.sin(phi)
+            x, y = cx + cos_t * ex - sin_t * ey, cy + sin_t * ex + cos_t * ey
+            if safety_margin <= x <= self.map_w - safety_margin and safety_margin <= y <= self.map_h - safety_margin:
+                return x, y
+        return super().sample_point(safety_margin)
+
+    def try_extend(self, x, y, maxd):
+        near = self.nearest_to(x, y)
+        nx, ny = self.nodes.point(near)
+        dx, dy = x - nx, y - ny
+        d = math.hypot(dx, dy)
+        if d > maxd:
+            x, y = nx + dx * maxd / d, ny + dy * maxd / d
+        at_goal = (x, y) == tuple(self.goal)
+        if (at_goal and self.goal_flag) or self.crosses_obstacle(nx, ny, x, y): return None
+
+        # Escolhe o pai de menor custo dentro do raio de vizinhança
+        radius = self.near_radius(maxd)
+        neighbours = self.nodes.within((x, y), radius)
+        cost = self.nodes.cost[:self.number_of_nodes()]
+        best, best_cost = near, float(cost[near]) + math.hypot(x - nx, y - ny)
+        if len(neighbours):
+            dists = self.nodes.distances((x, y))[neighbours]
+            for j in np.argsort(cost[neighbours] + dists):
+                j_idx, c = int(neighbours[j]), float(cost[neighbours[j]] + dists[j])
+                if c >= best_cost: break
+                if not self.crosses_obstacle(*self.nodes.point(j_idx), x, y):
+                    best, best_cost = j_idx, c; break
+        idx = self.add_node(x, y, best, best_cost)
+        if at_goal: self.goal_flag, self.goal_state = True, idx
+
+        # Religa os vizinhos que ficam mais baratos passando pelo novo nó
+        for j in neighbours:
+            j = int(j)
+            if j == best: continue
+            c = best_cost + self.distance(idx, j)
+            if c < float(self.nodes.cost[j]) and not self.crosses_obstacle(x, y, *self.nodes.point(j)):
+                self._reparent(j, idx, c)
+
+        self._connect_goal(idx, maxd)
+        return idx, best
+
+    def _connect_goal(self, idx, maxd):
+        """ Liga (ou religa) o nó do alvo quando o novo nó o enxerga dentro do passo. """
+        x, y = self.nodes.point(idx)
+        d = math.hypot(self.goal[0] - x, self.goal[1] - y)
+        if d >= maxd or (x, y) == tuple(self.goal): return
+        c = float(self.nodes.cost[idx]) + d
+        if c >= self.best_cost or self.crosses_obstacle(x, y, *self.goal): return
+        if self.goal_flag:
+            self._reparent(self.goal_state, idx, c)
+        else:
+            self.goal_state = self.add_node(self.goal[0], self.goal[1], idx, c)
+            self.goal_flag = True
+
+    def bias(self, step_size):
+        return self.try_extend(self.goal[0], self.goal[1], step_size)
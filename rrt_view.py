@@ -0,0 +1,149 @@
+from datetime import datetime
+import time
+import threading
+import pygame
+import instrumentation
+from rrt_planner import PlannerParams, PlanObserver, plan
+
+SCALE_FACTOR = 5
+
+class RRTMap:
+    def __init__(self, start, goal, map_dimensions):
+        self.start, self.goal = start, goal
+        self.map_h, self.map_w = map_dimensions
+        
+        # Janela de visualização em tempo real (tamanho normal)
+        pygame.display.set_caption('RRT Path Planning')
+        self.map = pygame.display.set_mode((self.map_w, self.map_h))
+        self.map.fill((255, 255, 255))
+
+        # Superfície de alta resolução para salvar (invisível)
+        self.hires_w = self.map_w * SCALE_FACTOR
+        self.hires_h = self.map_h * SCALE_FACTOR
+        self.hires_map = pygame.Surface((self.hires_w, self.hires_h))
+        self.hires_map.fill((255, 255, 255))
+
+        # Ajusta o tamanho dos elementos visuais
+        self.node_rad = 2
+        self.edge_thickness = 1
+        
+        # Cores
+        self.grey, self.blue, self.green, self.red = (70, 70, 70), (0, 0, 255), (0, 255, 0), (255, 0, 0)
+
+    def draw_map(self, obstacles):
+        # Desenha na superfície de alta resolução (com escala)
+        pygame.draw.circle(self.hires_map, self.green, (self.start[0]*SCALE_FACTOR, self.start[1]*SCALE_FACTOR), (self.node_rad + 5)*SCALE_FACTOR)
+        pygame.draw.circle(self.hires_map, self.red, (self.goal[0]*SCALE_FACTOR, self.goal[1]*SCALE_FACTOR), (self.node_rad + 15)*SCALE_FACTOR, 3*SCALE_FACTOR)
+        for x, y, w, h, *_ in obstacles:
+            scaled_obs = pygame.Rect(x*SCALE_FACTOR, y*SCALE_FACTOR, w*SCALE_FACTOR, h*SCALE_FACTOR)
+            pygame.draw.rect(self.hires_map, self.grey, scaled_obs)
+        
+        # Copia a versão de alta resolução para a tela, ajustando o tamanho
+        scaled_down_map = pygame.transform.smoothscale(self.hires_map, (self.map_w, self.map_h))
+        self.map.blit(scaled_down_map, (0, 0))
+
+    def draw_path(self, path_coords):
+        # Desenha o caminho final na superfície de alta resolução
+        for x, y, *_ in path_coords:
+            pygame.draw.circle(self.hires_map, self.red, (x*SCALE_FACTOR, y*SCALE_FACTOR), (self.node_rad + 3)*SCALE_FACTOR)
+
+    def draw_tree_updates(self, x, y, parent_x, parent_y):
+        # Desenha o crescimento da árvore na superfície de alta resolução
+        pos = (x*SCALE_FACTOR, y*SCALE_FACTOR)
+        parent_pos = (parent_x*SCALE_FACTOR, parent_y*SCALE_FACTOR)
+        pygame.draw.circle(self.hires_map, self.blue, pos, self.node_rad*SCALE_FACTOR)
+        pygame.draw.line(self.hires_map, self.blue, pos, parent_pos, self.edge_thickness*SCALE_FACTOR)
+        
+    def update_display(self):
+        # Atualiza a janela de visualização com a versão em alta resolução
+        scaled_down_map = pygame.transform.smoothscale(self.hires_map, (self.map_w, self.map_h))
+        self.map.blit(scaled_down_map, (0, 0))
+        pygame.display.update()
+
+
+class PygameObserver(PlanObserver):
+    """ Desenha a árvore no RRTMap durante o planejamento, limitando a taxa de redesenho. """
+    def __init__(self, rrt_map, max_fps=15):
+        self.rrt_map = rrt_map
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_redraw = 0.0
+
+    def on_edge(self, graph, idx, near):
+        # Em 3D desenha a projeção no plano (x, y)
+        self.rrt_map.draw_tree_updates(*graph.nodes.point(idx)[:2], *graph.nodes.point(near)[:2])
+
+    def on_iteration(self, i, graph):
+        now = time.perf_counter()
+        if now - self.last_redraw < self.min_interval:
+            return True
+        self.last_redraw = now
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: return False
+        self.rrt_map.update_display()
+        return True
+
+    def on_finish(self, result):
+        self.rrt_map.update_display()
+
+
+def replay(result, rrt_map, edges_per_frame=25, fps=60):
+    """ Redesenha a árvore de um PlanResult já calculado, na ordem em que os nós foram criados. """
+    clock = pygame.time.Clock()
+    # O RRT-Connect guarda duas árvores; os demais modos, uma só; o PRM não devolve árvore
+    trees = () if result.graph is None else getattr(result.graph, "trees", (result.graph,))
+    for graph in trees:
+        for i in range(1, graph.number_of_nodes()):
+            p = int(graph.parent[i])
+            rrt_map.draw_tree_updates(*graph.nodes.point(i)[:2], *graph.nodes.point(p)[:2])
+            if i % edges_per_frame == 0:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT: return False
+                rrt_map.update_display()
+                clock.tick(fps)
+    rrt_map.update_display()
+    return True
+
+
+def find_rrt_path(config, live=True):
+    """ Planeja com visualização: ao vivo (observador) ou reproduzindo a árvore ao final. """
+    pygame.init()
+    clock = pygame.time.Clock()
+    
+    params = PlannerParams.from_config(config)
+    rrt_map = RRTMap(config.START_POS, config.GOAL_POS, (config.SCREEN_HEIGHT, config.SCREEN_WIDTH))
+    instrumentation.wrap(rrt_map, ("draw_map", "draw_tree_updates", "draw_path", "update_display"), "view.")
+    rrt_map.draw_map(config.OBSTACLES)
+
+    observer = PygameObserver(rrt_map) if live else None
+    result = plan(config.START_POS, config.GOAL_POS, config.OBSTACLES, params, observer)
+    if result.cancelled or (not live and not replay(result, rrt_map)):
+        pygame.quit(); return None, None
+
+    if not result.success:
+        print("Caminho não encontrado dentro do limite de iterações.")
+        pygame.quit()
+        return None, None
+
+    print(f"Caminho encontrado em {result.iterations} iterações ({result.elapsed_s*1000:.1f} ms, {result.nodes} nós)!")
+    print(f"Primeira solução em {result.time_to_first_s*1000:.1f} ms | comprimento: {result.cost:.1f} cm")
+    path = result.path
+    rrt_map.draw_path(path)
+    rrt_map.update_display()
+    
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    filename = f"rrt_plan_inicial_{timestamp}.png"
+    # A compressão do PNG em 5x é lenta; salva uma cópia da superfície em segundo plano
+    threading.Thread(target=pygame.image.save, args=(rrt_map.hires_map.copy(), filename)).start()
+    print(f"Plano do RRT sendo salvo como '{filename}'")
+    
+    pygame.display.set_caption("Caminho Encontrado! Pressione ESPAÇO para continuar.")
+    waiting = True
+    while waiting:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit(); return None, None
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                waiting = False
+        clock.tick(30)
+    
+    return rrt_map, path
@@ -0,0 +1,63 @@
+import numpy as np
+from multiprocessing import shared_memory
+from telemetry import SAMPLE_DTYPE
+
+# Buffer circular em memória compartilhada, um produtor (thread do voo) e um consumidor
+# (processo do plotter). Layout: [seq (uint64) | padding até 64 bytes | capacity registros].
+# O produtor escreve o registro e só depois incrementa seq; o consumidor lê seq, copia
+# o que é novo e relê seq (seqlock): registros cujo slot o produtor já voltou a escrever durante
+# a cópia podem estar rasgados e são descartados. Não há fila nem pickle por item: se o consumidor
+# atrasar mais que a capacidade, ele simplesmente pula para as amostras mais antigas ainda disponíveis.
+
+_HEADER_BYTES = 64
+
+
+class SharedRing:
+    def __init__(self, capacity=4096, dtype=SAMPLE_DTYPE, name=None, create=True):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        size = _HEADER_BYTES + capacity * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf, offset=0)
+        self.data = np.ndarray((capacity,), dtype=self.dtype, buffer=self.shm.buf, offset=_HEADER_BYTES)
+        if create: self._seq[0] = 0
+
+    @classmethod
+    def attach(cls, name, capacity, dtype=SAMPLE_DTYPE):
+        """ Abre um buffer já criado por outro processo. """
+        # Filhos criados pelo multiprocessing compartilham o resource_tracker do pai,
+        # então só o dono (create=True) precisa chamar unlink.
+        return cls(capacity, dtype, name=name, create=False)
+
+    @property
+    def name(self): return self.shm.name
+
+    @property
+    def seq(self): return int(self._seq[0])
+
+    def append(self, record):
+        """ Produtor: grava o registro e publica incrementando o contador. """
+        seq = int(self._seq[0])
+        self.data[seq % self.capacity] = record
+        self._seq[0] = seq + 1
+
+    def read_since(self, last_seq):
+        """ Consumidor: retorna (blocos, novo_seq, perdidos). Os blocos são cópias, em ordem, só com
+        registros íntegros; os que o produtor sobrescreveu durante a cópia contam como perdidos. """
+        seq = int(self._seq[0])
+        start = max(last_seq, seq - self.capacity)
+        if start >= seq: return [], seq, start - last_seq
+        i0, i1 = start % self.capacity, seq % self.capacity
+        block = self.data[i0:i1].copy() if i0 < i1 else np.concatenate((self.data[i0:], self.data[:i1]))
+        # Enquanto copiávamos, o produtor pode ter publicado mais registros e estar escrevendo o de número
+        # `after`, que ocupa o slot do after - capacity: só os registros depois desse estão íntegros
+        valid = min(seq, max(start, int(self._seq[0]) - self.capacity + 1))
+        block = block[valid - start:]
+        return ([block] if len(block) else []), seq, valid - last_seq
+
+    def close(self):
+        # Solta as visões antes de fechar o mapeamento
+        self._seq = self.data = None
+        self.shm.close()
+        if self.owner: self.shm.unlink()
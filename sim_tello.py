@@ -0,0 +1,268 @@
+import math
+import random
+import socket
+import threading
+import time
+
+# Tello simulado para rodar o pipeline inteiro sem drone nem Wi-Fi.
+# Modelo cinemático simples: cada comando bloqueia pela latência + duração do movimento
+# (velocidade linear e de giro constantes), como o SDK real, que só responde "ok" no fim.
+# O estado é uma função do tempo simulado, então não há thread de física; com time_scale > 1
+# o relógio simulado corre mais rápido que o de parede e a missão termina antes.
+# Convenções do mapa: x, y em cm; yaw em graus, 0 = +y e positivo no sentido horário
+# (a frente do drone aponta para (sin yaw, cos yaw)), igual ao que o TelloManager assume.
+
+
+class SimTelloError(Exception):
+    pass
+
+
+def _wrap(angle): return (angle + 180) % 360 - 180
+
+
+class SimTello:
+    """ Subconjunto da API do djitellopy.Tello usado pelo TelloManager, sobre um modelo cinemático. """
+    def __init__(self, start_pos=(0, 0), start_yaw=0.0, speed_cm_s=70.0, yaw_rate_deg_s=90.0,
+                 climb_rate_cm_s=50.0, latency_s=0.1, noise=0.0, motion_noise=0.0, time_scale=1.0,
+                 takeoff_height_cm=80.0, mission_pads=False, battery=100.0, battery_drain_per_s=0.15, seed=None,
+                 pad_origin=(0.0, 0.0, 0.0), pad_yaw_deg=0.0):
+        self.speed_cm_s = speed_cm_s
+        self.yaw_rate_deg_s = yaw_rate_deg_s
+        self.climb_rate_cm_s = climb_rate_cm_s
+        self.latency_s = latency_s
+        self.noise = noise                # desvio padrão (cm, graus, cm/s) das leituras de estado
+        self.motion_noise = motion_noise  # erro relativo de execução de cada movimento
+        self.time_scale = time_scale
+        self.takeoff_height_cm = takeoff_height_cm
+        self.mission_pads = mission_pads  # com True, reporta x/y/z no referencial do mission pad
+        self.pad_origin, self.pad_yaw_deg = pad_origin, pad_yaw_deg  # pad no mapa, como no estimador
+        self.battery_drain_per_s = battery_drain_per_s
+        self.rng = random.Random(seed)
+        self._battery0 = battery
+        self._lock = threading.Lock()
+        self._t_wall0 = time.monotonic()
+        self._pose = (float(start_pos[0]), float(start_pos[1]), 0.0, float(start_yaw))
+        self._motion = None  # (t_inicio, duração, f(tau) -> pose)
+        self.is_flying = False
+        self.commands = []   # histórico (t_sim, comando), útil para comparar executores
+
+    # --- Relógio simulado ---
+    def now(self): return (time.monotonic() - self._t_wall0) * self.time_scale
+
+    def sleep(self, sim_seconds):
+        if sim_seconds > 0: time.sleep(sim_seconds / self.time_scale)
+
+    def pose(self, t=None):
+        """ Pose verdadeira (x, y, z, yaw) no tempo simulado t. """
+        t = self.now() if t is None else t
+        with self._lock:
+            if self._motion is None: return self._pose
+            t0, duration, f = self._motion
+            if t >= t0 + duration:
+                self._pose, self._motion = f(1.0), None
+                return self._pose
+            return f(max(0.0, (t - t0) / duration))
+
+    def _velocity(self, t):
+        dt = 0.05
+        (x0, y0, z0, _), (x1, y1, z1, _) = self.pose(t - dt), self.pose(t)
+        return (x1 - x0) / dt, (y1 - y0) / dt, (z1 - z0) / dt
+
+    def _run(self, name, duration, f):
+        """ Executa um movimento bloqueante: latência, depois a trajetória f durante `duration`. """
+        t = self.now() + self.latency_s
+        self.pose()  # consolida o movimento anterior
+        with self._lock:
+            self.commands.append((t, name))
+            self._motion = (t, max(duration, 1e-6), f)
+        self.sleep(self.latency_s + duration)
+        self.pose()
+
+    def _jitter(self, value):
+        return value * (1 + self.rng.gauss(0, self.motion_noise)) if self.motion_noise else value
+
+    def _require_flying(self, name):
+        if not self.is_flying: raise SimTelloError(f"Command '{name}' was unsuccessful. Message: error Not joystick")
+
+    # --- Conexão e consultas ---
+    def connect(self, wait_for_state=True): self.commands.append((self.now(), "command"))
+    def end(self): pass
+    def get_battery(self): return int(max(0.0, self._battery0 - self.battery_drain_per_s * self.now()))
+    def get_height(self): return int(round(self.pose()[2]))
+    def get_yaw(self): return int(round(_wrap(self.pose()[3])))
+
+    def get_current_state(self):
+        """ Mesmo formato do dicionário do djitellopy (velocidades em dm/s, acelerações em mg). """
+        t = self.now()
+        x, y, z, yaw = self.pose(t)
+        vx, vy, vz = self._velocity(t)
+        n = (lambda: self.rng.gauss(0, self.noise)) if self.noise else (lambda: 0.0)
+        # vgx/vgy nos eixos da decolagem (yaw 0): frente = +y do mapa, direita = +x
+        state = {"pitch": round(n()), "roll": round(n()), "yaw": round(_wrap(yaw + n())),
+                 "vgx": round((vy + n()) / 10), "vgy": round((vx + n()) / 10), "vgz": round((vz + n()) / 10),
+                 "templ": 60, "temph": 62, "tof": max(10, round(z + n()) + 10), "h": round(z),
+                 "bat": self.get_battery(), "baro": round(z / 100 + n() / 100, 2), "time": int(t),
+                 "agx": round(n()), "agy": round(n()), "agz": round(-1000 + n())}
+        if self.mission_pads and z > 0:
+            r = math.radians(self.pad_yaw_deg)
+            dx, dy, dz = x - self.pad_origin[0], y - self.pad_origin[1], z - self.pad_origin[2]
+            state.update(mid=1, x=round(dx * math.cos(r) - dy * math.sin(r) + n()),
+                         y=round(dx * math.sin(r) + dy * math.cos(r) + n()), z=round(dz + n()))
+        else:
+            state.update(mid=-1, x=-100, y=-100, z=-100)
+        return state
+
+    # --- Decolagem e pouso ---
+    def takeoff(self):
+        x, y, _, yaw = self.pose()
+        h = self.takeoff_height_cm
+        self.is_flying = True
+        self._run("takeoff", h / self.climb_rate_cm_s, lambda tau: (x, y, tau * h, yaw))
+
+    def land(self):
+        self._require_flying("land")
+        x, y, z, yaw = self.pose()
+        self._run("land", z / self.climb_rate_cm_s, lambda tau: (x, y, (1 - tau) * z, yaw))
+        self.is_flying = False
+
+    # --- Movimentos no referencial do drone ---
+    def _move_body(self, name, forward, left, up, speed=None):
+        self._require_flying(name)
+        x, y, z, yaw = self.pose()
+        r = math.radians(yaw)
+        forward, left, up = self._jitter(forward), self._jitter(left), self._jitter(up)
+        dx = forward * math.sin(r) - left * math.cos(r)
+        dy = forward * math.cos(r) + left * math.sin(r)
+        dist = math.sqrt(dx * dx + dy * dy + up * up)
+        self._run(name, dist / (speed or self.speed_cm_s),
+                  lambda tau: (x + tau * dx, y + tau * dy, max(0.0, z + tau * up), yaw))
+
+    def _check_move(self, name, d):
+        if not 20 <= d <= 500: raise SimTelloError(f"Command '{name} {d}' was unsuccessful. Message: out of range")
+
+    def move_forward(self, x): self._check_move("forward", x); self._move_body("forward", x, 0, 0)
+    def move_back(self, x): self._check_move("back", x); self._move_body("back", -x, 0, 0)
+    def move_left(self, x): self._check_move("left", x); self._move_body("left", 0, x, 0)
+    def move_right(self, x): self._check_move("right", x); self._move_body("right", 0, -x, 0)
+    def move_up(self, x): self._check_move("up", x); self._move_body("up", 0, 0, x, self.climb_rate_cm_s)
+    def move_down(self, x): self._check_move("down", x); self._move_body("down", 0, 0, -x, self.climb_rate_cm_s)
+
+    def _rotate(self, name, degrees):
+        self._require_flying(name)
+        x, y, z, yaw = self.pose()
+        d = self._jitter(degrees)
+        self._run(name, abs(d) / self.yaw_rate_deg_s, lambda tau: (x, y, z, yaw + tau * d))
+
+    def rotate_clockwise(self, x): self._rotate("cw", x)
+    def rotate_counter_clockwise(self, x): self._rotate("ccw", -x)
+
+    def go_xyz_speed(self, x, y, z, speed):
+        """ x para frente, y para a esquerda, z para cima (cm), como no SDK. """
+        if max(abs(x), abs(y), abs(z)) < 20 or max(abs(x), abs(y), abs(z)) > 500 or not 10 <= speed <= 100:
+            raise SimTelloError(f"Command 'go {x} {y} {z} {speed}' was unsuccessful. Message: out of range")
+        self._move_body("go", x, y, z, speed)
+
+    def curve_xyz_speed(self, x1, y1, z1, x2, y2, z2, speed):
+        """ Arco de círculo (no plano horizontal) do ponto atual por (x1, y1) até (x2, y2). """
+        cmd = f"curve {x1} {y1} {z1} {x2} {y2} {z2} {speed}"
+        self._require_flying("curve")
+        if not 10 <= speed <= 60: raise SimTelloError(f"Command '{cmd}' was unsuccessful. Message: out of range")
+        d = 2 * (x1 * y2 - y1 * x2)
+        if abs(d) < 1e-6: raise SimTelloError(f"Command '{cmd}' was unsuccessful. Message: error")
+        # Circuncentro de (0,0), p1, p2 no referencial do drone
+        s1, s2 = x1 * x1 + y1 * y1, x2 * x2 + y2 * y2
+        cx, cy = (s1 * y2 - s2 * y1) / d, (s2 * x1 - s1 * x2) / d
+        radius = math.hypot(cx, cy)
+        if not 50 <= radius <= 1000:
+            raise SimTelloError(f"Command '{cmd}' was unsuccessful. Message: curve radius out of range")
+        a0, a1, a2 = (math.atan2(py - cy, px - cx) for px, py in ((0, 0), (x1, y1), (x2, y2)))
+        sweep = (a2 - a0) % (2 * math.pi)
+        if (a1 - a0) % (2 * math.pi) > sweep: sweep -= 2 * math.pi  # o arco precisa passar por p1
+        x, y, z, yaw = self.pose()
+        r = math.radians(yaw)
+
+        def f(tau):
+            a = a0 + tau * sweep
+            bf, bl = cx + radius * math.cos(a), cy + radius * math.sin(a)
+            return (x + bf * math.sin(r) - bl * math.cos(r), y + bf * math.cos(r) + bl * math.sin(r),
+                    max(0.0, z + tau * z2), yaw)
+        self._run("curve", abs(sweep) * radius / speed, f)
+
+
+class TelloUDPServer:
+    """ Servidor local que fala o protocolo de texto do SDK do Tello sobre um SimTello:
+    comandos em `port` (resposta "ok"/"error"/valor para o remetente) e, depois de "command",
+    pacotes de estado "chave:valor;...\\r\\n" enviados a `state_port` do cliente em state_rate_hz.
+    O djitellopy também faz bind local em 8889/8890, então para usá-lo contra este servidor
+    rode o servidor em outra máquina/namespace de rede; clientes próprios podem usar portas livres. """
+    def __init__(self, sim, host="127.0.0.1", port=8889, state_port=8890, state_rate_hz=10):
+        self.sim = sim
+        self.state_port = state_port
+        self.state_period = 1.0 / state_rate_hz
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.2)
+        self.address = self.sock.getsockname()
+        self.client = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _commands(self):
+        s = self.sim
+        n = lambda a: [int(v) for v in a]
+        return {
+            "command": lambda a: None, "takeoff": lambda a: s.takeoff(), "land": lambda a: s.land(),
+            "forward": lambda a: s.move_forward(*n(a)), "back": lambda a: s.move_back(*n(a)),
+            "left": lambda a: s.move_left(*n(a)), "right": lambda a: s.move_right(*n(a)),
+            "up": lambda a: s.move_up(*n(a)), "down": lambda a: s.move_down(*n(a)),
+            "cw": lambda a: s.rotate_clockwise(*n(a)), "ccw": lambda a: s.rotate_counter_clockwise(*n(a)),
+            "go": lambda a: s.go_xyz_speed(*n(a)), "curve": lambda a: s.curve_xyz_speed(*n(a)),
+            "battery?": lambda a: s.get_battery(), "height?": lambda a: f"{s.get_height() // 10}dm",
+            "speed?": lambda a: s.speed_cm_s, "time?": lambda a: f"{int(s.now())}s",
+        }
+
+    def handle(self, text):
+        """ Executa uma linha do protocolo e devolve a resposta em texto. """
+        name, *args = text.strip().split()
+        fn = self._commands().get(name)
+        if fn is None: return "unknown command: " + name
+        try:
+            value = fn(args)
+        except (SimTelloError, TypeError, ValueError) as e:
+            return f"error {e}"
+        return "ok" if value is None else str(value)
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            text = data.decode(errors="ignore")
+            if text.strip() == "command": self.client = addr[0]
+            self.sock.sendto(self.handle(text).encode(), addr)
+
+    def _stream_state(self):
+        out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        while not self._stop.wait(self.state_period):
+            if self.client is None: continue
+            state = "".join(f"{k}:{v};" for k, v in self.sim.get_current_state().items()) + "\r\n"
+            out.sendto(state.encode(), (self.client, self.state_port))
+        out.close()
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [threading.Thread(target=fn, daemon=True) for fn in (self._serve, self._stream_state)]
+        for t in self._threads: t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads: t.join(timeout=1)
+        self.sock.close()
+
+
+def sim_from_config(config, start_pos):
+    return SimTello(start_pos, speed_cm_s=config.SIM_SPEED_CM_S, yaw_rate_deg_s=config.SIM_YAW_RATE_DEG_S,
+                    latency_s=config.SIM_LATENCY_S, noise=config.SIM_NOISE, motion_noise=config.SIM_MOTION_NOISE,
+                    time_scale=config.SIM_TIME_SCALE, seed=config.PLANNER_SEED)
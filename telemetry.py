@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+import numpy as np
+
+# Registro de um instante de telemetria. Os 9 primeiros campos correspondem à tupla
+# usada pelo plotter e pelos gráficos finais: (t, x, y, z, roll, pitch, yaw, speed, waypoint).
+SAMPLE_DTYPE = np.dtype([
+    ("t", np.float64),  # segundos desde o início do voo (relógio monotônico)
+    ("x", np.float32), ("y", np.float32), ("z", np.float32),
+    ("roll", np.float32), ("pitch", np.float32), ("yaw", np.float32),
+    ("speed", np.float32),
+    ("waypoint", np.int32),
+    ("vgx", np.float32), ("vgy", np.float32), ("vgz", np.float32),
+    ("agx", np.float32), ("agy", np.float32), ("agz", np.float32),
+    ("tof", np.float32), ("bat", np.float32),
+    ("mid", np.int16), ("mpx", np.float32), ("mpy", np.float32), ("mpz", np.float32),  # mission pad
+    ("x_std", np.float32), ("y_std", np.float32),  # incerteza da posição (estimador), 0 sem estimador
+])
+TUPLE_FIELDS = ("t", "x", "y", "z", "roll", "pitch", "yaw", "speed", "waypoint")
+
+
+def as_tuple(record):
+    """ Converte um registro no formato de tupla de 9 campos usado pelo plotter. """
+    return tuple(record[f].item() for f in TUPLE_FIELDS)
+
+
+class RingBuffer:
+    """ Buffer circular pré-alocado de registros; seq conta o total já escrito. """
+    def __init__(self, capacity, dtype=SAMPLE_DTYPE):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        with self._lock:
+            self.data[self.seq % self.capacity] = record
+            self.seq += 1
+
+    def latest(self):
+        with self._lock:
+            return self.data[(self.seq - 1) % self.capacity].copy() if self.seq else None
+
+    def since(self, seq):
+        """ Registros escritos a partir de seq (os mais antigos que a capacidade já foram sobrescritos).
+        Retorna (registros, novo_seq). """
+        with self._lock:
+            start = max(seq, self.seq - self.capacity)
+            idx = np.arange(start, self.seq) % self.capacity
+            return self.data[idx].copy(), self.seq
+
+
+class GrowableRecords:
+    """ Histórico completo do voo em um array estruturado que dobra de tamanho quando enche. """
+    def __init__(self, capacity=1024, dtype=SAMPLE_DTYPE):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.n = 0
+
+    def __len__(self): return self.n
+
+    def append(self, record):
+        if self.n == len(self.data):
+            grown = np.zeros(len(self.data) * 2, dtype=self.data.dtype); grown[:self.n] = self.data
+            self.data = grown
+        self.data[self.n] = record
+        self.n += 1
+
+    def view(self): return self.data[:self.n]
+
+
+class TelemetrySampler:
+    """ Thread que lê o stream de estado do Tello (get_current_state, sem comandos bloqueantes)
+    em taxa fixa e grava cada amostra no buffer circular e no histórico.
+    position_fn() -> (x, y) e waypoint_fn() -> int vêm do executor do voo. """
+    def __init__(self, tello, rate_hz=20, capacity=4096, position_fn=None, waypoint_fn=None, speed_scale=10.0,
+                 history=None, time_scale=1.0, estimator=None):
+        self.tello = tello
+        # time_scale > 1 (simulador acelerado): rate_hz e os tempos gravados ficam no relógio do drone
+        self.time_scale = time_scale
+        self.period = 1.0 / (rate_hz * time_scale)
+        self.ring = RingBuffer(capacity)
+        # Destino do histórico completo: em memória (GrowableRecords) ou em disco (flight_log.FlightLogWriter)
+        self.history = history if history is not None else GrowableRecords()
+        self.position_fn = position_fn or (lambda: (0.0, 0.0))
+        self.waypoint_fn = waypoint_fn or (lambda: 0)
+        self.speed_scale = speed_scale  # vgx/vgy/vgz chegam em dm/s pelo SDK
+        # Com estimador (estimator.KalmanEstimator), x/y/z do registro passam a ser a estimativa
+        # filtrada em vez da posição vinda de position_fn
+        self.estimator = estimator
+        self.listeners = []  # chamados com cada registro (p.ex. envio ao plotter)
+        self.overruns = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.t0 = None
+
+    def add_listener(self, fn): self.listeners.append(fn)
+
+    def sample(self):
+        """ Lê o estado atual e monta um registro. """
+        s = self.tello.get_current_state()
+        rec = np.zeros((), dtype=SAMPLE_DTYPE)
+        x, y = self.position_fn()
+        vgx, vgy, vgz = (float(s.get(k, 0)) * self.speed_scale for k in ("vgx", "vgy", "vgz"))
+        rec["t"] = (time.monotonic() - self.t0) * self.time_scale
+        rec["x"], rec["y"], rec["z"] = x, y, float(s.get("h", 0))
+        rec["roll"], rec["pitch"], rec["yaw"] = s.get("roll", 0), s.get("pitch", 0), s.get("yaw", 0)
+        rec["vgx"], rec["vgy"], rec["vgz"] = vgx, vgy, vgz
+        rec["speed"] = math.hypot(vgx, vgy)
+        rec["agx"], rec["agy"], rec["agz"] = s.get("agx", 0), s.get("agy", 0), s.get("agz", 0)
+        rec["tof"], rec["bat"] = s.get("tof", 0), s.get("bat", 0)
+        rec["mid"] = s.get("mid", -1)
+        rec["mpx"], rec["mpy"], rec["mpz"] = s.get("x", 0), s.get("y", 0), s.get("z", 0)
+        rec["waypoint"] = self.waypoint_fn()
+        if self.estimator is not None: self.estimator.update_record(rec)
+        return rec
+
+    def record(self, rec):
+        self.ring.append(rec)
+        self.history.append(rec)
+        for fn in self.listeners: fn(rec)
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.record(self.sample())
+            except Exception as e:
+                print(f"\nFalha na telemetria: {e}")
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Atrasou: pula os ticks perdidos em vez de tentar recuperar em rajada
+                self.overruns += 1
+                next_tick = time.monotonic()
+            else:
+                self._stop.wait(delay)
+
+    def start(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread: self._thread.join(timeout=1)
+
+    def latest(self): return self.ring.latest()
@@ -1,111 +1,332 @@
 import time
 import math
 import threading
-from djitellopy import Tello
+import itertools
+import instrumentation
+from telemetry import TelemetrySampler, as_tuple
+from flight_log import FlightLogWriter, load_flight_log
+from geometry import arc_points, make_segment_checker
+
+# Comandos do SDK e esperas do executor cronometrados quando a instrumentação está ligada
+TELLO_COMMANDS = ("connect", "takeoff", "land", "move_forward", "move_up", "move_down", "rotate_clockwise",
+                  "rotate_counter_clockwise", "go_xyz_speed", "curve_xyz_speed", "get_yaw", "get_height",
+                  "get_battery", "get_current_state")
+FLIGHT_STEPS = ("_sleep", "_wait_until", "_segment_legacy", "_segment_settle", "_segment_go", "_segments_curve")
 
 class TelloManager:
-    def __init__(self, data_queue, cancel_event):
-        self.tello = Tello()
-        self.data_queue = data_queue
+    def __init__(self, data_ring, cancel_event, telemetry_rate_hz=20, telemetry_capacity=4096, speed_scale=10.0,
+                 log_path=None, log_flush_s=1.0, executor_mode="settle", go_speed_cm_s=50, settle_speed_cm_s=5.0,
+                 tello=None, estimator=None, log_metadata=None, obstacles=None, obstacle_margin=0,
+                 max_start_std_cm=4.0):
+        if tello is None:
+            from djitellopy import Tello
+            tello = Tello()
+        self.tello = instrumentation.wrap(tello, TELLO_COMMANDS, "tello.")  # djitellopy.Tello ou sim_tello.SimTello
+        instrumentation.wrap(self, FLIGHT_STEPS, "flight.")
+        # O simulador pode rodar mais rápido que o tempo real; esperas e tempos medidos seguem o relógio dele
+        self.time_scale = getattr(tello, "time_scale", 1.0)
+        self.data_ring = data_ring  # shm_ring.SharedRing lido pelo processo do plotter
         self.cancel_event = cancel_event
         self.is_flying = False
         
         self.x = self.y = self.z = self.angle = 0
-        self.path_history = []
         self.current_waypoint_index = 0
         self.start_time = 0
+        self.mission_time_s = None
+        self.flown_paths = []
+        # Caminho novo entregue pelo replanejamento; aplicado entre um segmento e outro
+        self._pending_path = None
+        self._path_lock = threading.Lock()
+        self._path_done = threading.Event()
+        self.path_update_accepted = None
+        # Fim do segmento em execução: é dali que o próximo segmento (e um caminho replanejado) começa
+        self.segment_target = None
+
+        # "legacy": esperas fixas originais; "settle": esperas pelo stream de estado;
+        # "go": um 'go x y z speed' por segmento; "curve": arcos 'curve' por pares de segmentos
+        self.executor_mode = executor_mode
+        self.go_speed_cm_s = go_speed_cm_s
+        self.settle_speed_cm_s = settle_speed_cm_s
+        # Função que devolve os obstáculos atuais; o arco de um 'curve' não é o caminho checado pelo
+        # planejador, então ele é conferido contra eles antes de ser enviado
+        self.obstacles = obstacles
+        self.obstacle_margin = obstacle_margin
+
+        # Com estimador (estimator.KalmanEstimator) a posição vem da telemetria filtrada e, enquanto o
+        # desvio padrão dela for menor que max_start_std_cm (na prática, com mission pad à vista), cada
+        # segmento parte da posição estimada (malha fechada) em vez do waypoint planejado
+        self.estimator = estimator
+        self.max_start_std_cm = max_start_std_cm
+
+        # Com log_path, o histórico vai direto para o disco em vez de crescer na memória
+        self.log_path = log_path
+        self.flight_log = FlightLogWriter(log_path, flush_interval_s=log_flush_s,
+                                                       metadata=log_metadata) if log_path else None
+
+        # Amostragem do stream de estado em taxa fixa; alimenta o plotter e os gráficos finais
+        self.telemetry = TelemetrySampler(self.tello, telemetry_rate_hz, telemetry_capacity,
+                                          position_fn=lambda: (self.x, self.y),
+                                          waypoint_fn=lambda: self.current_waypoint_index,
+                                          speed_scale=speed_scale, history=self.flight_log,
+                                          time_scale=self.time_scale, estimator=estimator)
+        self.telemetry.add_listener(self.data_ring.append)
+
+    def records(self):
+        """ Histórico completo como array estruturado (memmap do log, se houver). """
+        if self.flight_log is not None:
+            self.flight_log.flush()
+            return load_flight_log(self.log_path)
+        return self.telemetry.history.view()
+
+    @property
+    def path_history(self):
+        """ Histórico completo no formato de tuplas (t, x, y, z, roll, pitch, yaw, speed, waypoint). """
+        return [as_tuple(rec) for rec in self.records()]
 
     def _feedback(self):
-        """ Thread simples para imprimir o feedback no console. """
+        """ Thread simples para imprimir o feedback no console, a partir da última amostra de telemetria. """
         while not self.cancel_event.is_set():
-            try:
-                # Lê a velocidade para o feedback do console
-                speed = math.hypot(self.tello.get_speed_x(), self.tello.get_speed_y())
-                print(f"Pos(x,y)=({self.x:.1f},{self.y:.1f}) | z={self.z}cm | v={speed:.1f}cm/s | Waypoint: {self.current_waypoint_index} ", end='\r')
-                time.sleep(0.5)
-            except Exception:
-                break
+            rec = self.telemetry.latest()
+            if rec is not None:
+                print(f"Pos(x,y)=({rec['x']:.1f},{rec['y']:.1f}) | z={rec['z']:.0f}cm | v={rec['speed']:.1f}cm/s | Waypoint: {self.current_waypoint_index} ", end='\r')
+            self.cancel_event.wait(0.5)
         print("\nFeedback encerrado.")
 
-    def execute_flight_plan(self, path, target_altitude):
+    # --- Leituras de estado a partir da telemetria (sem comandos de consulta ao drone) ---
+    def _state(self, field, fallback):
+        rec = self.telemetry.latest()
+        return float(rec[field]) if rec is not None else fallback()
+
+    def position(self):
+        rec = self.telemetry.latest()
+        if self.estimator is None or rec is None: return self.x, self.y
+        return float(rec['x']), float(rec['y'])
+
+    def _fixed_position(self):
+        """ Posição estimada, se o estimador estiver confiante o bastante para corrigir o segmento; senão None. """
+        rec = self.telemetry.latest()
+        if self.estimator is None or rec is None: return None
+        if max(rec['x_std'], rec['y_std']) > self.max_start_std_cm: return None
+        return float(rec['x']), float(rec['y'])
+
+    def _yaw(self): return self._state('yaw', self.tello.get_yaw)
+    def _height(self): return self._state('z', self.tello.get_height)
+
+    def _sleep(self, seconds): time.sleep(seconds / self.time_scale)
+
+    def _wait_until(self, condition, timeout, hold=3):
+        """ Espera até condition() valer em `hold` amostras seguidas de telemetria (ou timeout). """
+        deadline, ok = time.monotonic() + timeout / self.time_scale, 0
+        while time.monotonic() < deadline and not self.cancel_event.is_set():
+            ok = ok + 1 if condition() else 0
+            if ok >= hold: return True
+            time.sleep(self.telemetry.period)
+        return False
+
+    def _wait_settled(self, timeout=1.0):
+        """ Considera o drone parado quando a velocidade horizontal fica abaixo do limiar. """
+        return self._wait_until(lambda: self._state('speed', lambda: 0.0) < self.settle_speed_cm_s, timeout)
+
+    def _wait_heading(self, target, timeout=1.5, tolerance=3.0):
+        return self._wait_until(lambda: abs((self._yaw() - target + 180) % 360 - 180) <= tolerance, timeout)
+
+    # --- Execução de um segmento em cada modo ---
+    def _rotate_to(self, target_angle, current_yaw):
+        rot = (target_angle - current_yaw + 180) % 360 - 180
+        if abs(rot) <= 5: return False
+        if rot > 0: self.tello.rotate_clockwise(int(rot))
+        else: self.tello.rotate_counter_clockwise(int(-rot))
+        return True
+
+    def _dz(self, p):
+        return max(-500, min(500, p[2] - self._height())) if len(p) > 2 else 0
+
+    def _advance(self, dist, p):
+        """ Avança dist na direção atual. Com waypoint 3D a subida/descida vai no mesmo comando ('go'
+        frente/cima), em linha reta como o planejador checou, em vez de avançar e depois subir (caminho em L).
+        Retorna False se não havia o que mover. """
+        dz = self._dz(p)
+        if dz and max(dist, abs(dz)) >= 20:
+            self.tello.go_xyz_speed(int(min(500, dist)), 0, int(dz), self.go_speed_cm_s)
+        elif dist > 0:
+            self.tello.move_forward(int(max(20, min(500, dist))))
+        else:
+            return False
+        return True
+
+    def _segment_legacy(self, p1, p2):
+        """ Modo original: consulta o yaw, gira, espera 1.5s, avança, espera 1s. """
+        dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+        dist = math.hypot(dx, dy)
+        if self._rotate_to(math.degrees(math.atan2(dx, dy)), self.tello.get_yaw()):
+            self._sleep(1.5)
+        if not self.cancel_event.is_set() and self._advance(dist, p2):
+            self._sleep(1)
+        self.angle = self.tello.get_yaw()
+        rad = math.radians(self.angle)
+        self.x += dist * math.sin(rad)
+        self.y += dist * math.cos(rad)
+        self.z = self.tello.get_height()
+
+    def _segment_settle(self, p1, p2):
+        """ Mesmos comandos, mas as esperas fixas viram detecção de acomodação pelo stream de estado. """
+        dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+        dist = math.hypot(dx, dy)
+        target = math.degrees(math.atan2(dx, dy))
+        if self._rotate_to(target, self._yaw()):
+            self._wait_heading(target)
+        if not self.cancel_event.is_set() and self._advance(dist, p2):
+            self._wait_settled()
+        self.angle = self._yaw()
+        rad = math.radians(self.angle)
+        self.x += dist * math.sin(rad)
+        self.y += dist * math.cos(rad)
+        self.z = self._height()
+
+    def _body_offset(self, p, q):
+        """ Deslocamento de p para q no referencial do drone (frente, esquerda), pelo yaw atual. """
+        yaw = math.radians(self._yaw())
+        dx, dy = q[0] - p[0], q[1] - p[1]
+        forward = dx * math.sin(yaw) + dy * math.cos(yaw)
+        left = -(dx * math.cos(yaw) - dy * math.sin(yaw))
+        return forward, left
+
+    def _segment_go(self, p1, p2):
+        """ Um único 'go x y z speed' por segmento: sem girar e sem esperas fixas. """
+        f, l = self._body_offset(p1, p2)
+        dz = self._dz(p2)
+        if max(abs(f), abs(l), abs(dz)) < 20:
+            # Abaixo do mínimo do SDK para o go; cai no modo com rotação
+            return self._segment_settle(p1, p2)
+        self.tello.go_xyz_speed(int(max(-500, min(500, f))), int(max(-500, min(500, l))), int(dz), self.go_speed_cm_s)
+        self.x, self.y = p2[:2]
+        self.z = self._height()
+
+    def _segments_curve(self, p1, p2, p3):
+        """ Dois segmentos em um único arco 'curve' passando por p2 e terminando em p3. """
+        f1, l1 = self._body_offset(p1, p2)
+        f2, l2 = self._body_offset(p1, p3)
+        coords = [int(max(-500, min(500, c))) for c in (f1, l1, self._dz(p2), f2, l2, self._dz(p3))]
+        self.tello.curve_xyz_speed(*coords, min(60, self.go_speed_cm_s))
+        self.x, self.y = p3[:2]
+        self.z = self._height()
+
+    def _arc_collides(self, p1, p2, p3):
+        """ True se o arco do 'curve' de p1 por p2 até p3 cruza algum obstáculo inflado (amostrado). """
+        if self.obstacles is None: return False
+        if len(p2) > 2 and len(p1) < 3: p1 = tuple(p1[:2]) + (self._height(),)
+        collides = make_segment_checker(self.obstacles(), self.obstacle_margin, 3 if len(p2) > 2 else 2)
+        points = arc_points(p1, p2, p3)
+        return any(collides(*a, *b) for a, b in zip(points, points[1:]))
+
+    def replan_origin(self):
+        """ Ponto de partida para um replanejamento: o fim do segmento em voo. Um caminho novo só é
+        aplicado entre segmentos, então é dali (e não da posição no meio do segmento) que ele sai. """
+        target = self.segment_target
+        return tuple(target) if target is not None else self.position()
+
+    def update_path(self, path):
+        """ Troca o caminho em execução; vale a partir do próximo segmento e precisa começar no fim do
+        segmento atual (replan_origin). Veja wait_path_update. """
+        with self._path_lock:
+            self._pending_path = list(path)
+            self._path_done.clear()
+
+    def wait_path_update(self, timeout=None):
+        """ True se o último update_path foi aplicado, False se foi recusado por chegar tarde (o drone já
+        tinha passado da origem dele) e None se ainda está pendente. """
+        return self.path_update_accepted if self._path_done.wait(timeout) else None
+
+    def fly_path(self, path):
+        """ Percorre os waypoints do caminho com o modo de execução configurado. """
+        self.active_path = list(path)
+        i = straight_until = 0
+        while True:
+            with self._path_lock:
+                if self._pending_path is not None:
+                    new, self._pending_path = self._pending_path, None
+                    # Só aplica se o caminho novo sai de onde o drone está entre segmentos (path[i]);
+                    # senão a primeira aresta voada não seria a que foi checada contra os obstáculos
+                    self.path_update_accepted = math.dist(new[0][:2], path[i][:2]) <= 1.0
+                    if self.path_update_accepted:
+                        # active_path (o caminho registrado em flown_paths) = trecho já voado + caminho novo
+                        flown = len(self.active_path) - len(path) + i
+                        self.active_path = list(self.active_path[:flown]) + new
+                        path, i, straight_until = new, 0, 0
+                    self._path_done.set()
+            if i >= len(path) - 1: break
+            if self.cancel_event.is_set():
+                print("\nVoo cancelado pelo usuário."); break
+            self.current_waypoint_index = i + 1
+            # Em malha fechada o segmento parte de onde o drone está, corrigindo o desvio acumulado
+            start = self._fixed_position() or path[i]
+            curve = self.executor_mode == "curve" and i + 2 < len(path) and i >= straight_until
+            if curve and self._arc_collides(start, path[i + 1], path[i + 2]):
+                # O arco sai da poligonal checada pelo planejador: os dois segmentos vão em linha reta
+                print("\nArco do curve cruza um obstáculo; usando go.")
+                straight_until, curve = i + 2, False
+            if curve:
+                self.segment_target = path[i + 2]
+                try:
+                    self._segments_curve(start, path[i + 1], path[i + 2])
+                    self.current_waypoint_index = i + 2
+                    i += 2; continue
+                except Exception as e:
+                    # Arcos fora dos limites do SDK (raio 0.5-10m, pontos colineares) são recusados
+                    print(f"\nCurve recusado ({e}); usando go.")
+            self.segment_target = path[i + 1]
+            segment = {"legacy": self._segment_legacy, "settle": self._segment_settle}.get(self.executor_mode, self._segment_go)
+            segment(start, path[i + 1])
+            fixed = self._fixed_position()
+            if fixed is not None: self.x, self.y = fixed
+            i += 1
+
+    def execute_flight_plan(self, path, target_altitude, next_legs=None):
+        """ Decola, voa o caminho e pousa. next_legs (iterável de caminhos, p.ex. uma fila de missões
+        planejada em segundo plano) é voado em seguida, sem pousar entre os trechos. """
         feedback_thread = None
         try:
             self.tello.connect()
-            self.start_time = time.time()
+            self.start_time = time.monotonic()
             bat = self.tello.get_battery()
             print(f"Bateria: {bat}%")
             if bat < 20: print("Bateria baixa. Voo cancelado."); return
 
+            self.x, self.y = path[0][:2]
+            if self.estimator is not None: self.estimator.reset(path[0][:2])
+            self.telemetry.start(self.start_time)
+
             self.tello.takeoff()
             self.is_flying = True
-            time.sleep(1)
+            if self.executor_mode == "legacy": self._sleep(1)
+            else: self._wait_settled(timeout=1.0)
 
             h = self.tello.get_height()
             move_down_cm = h - target_altitude
             if move_down_cm >= 20:
                 self.tello.move_down(move_down_cm)
-                time.sleep(2)
+                if self.executor_mode == "legacy": self._sleep(2)
+                else: self._wait_settled(timeout=2.0)
             
-            self.x, self.y = path[0]
             self.z = self.tello.get_height()
-            
-            initial_state = (0, self.x, self.y, self.z, 0, 0, self.angle, 0, self.current_waypoint_index)
-            self.path_history.append(initial_state)
-            self.data_queue.put(initial_state)
 
             feedback_thread = threading.Thread(target=self._feedback, daemon=True)
             feedback_thread.start()
 
-            for i in range(len(path) - 1):
-                if self.cancel_event.is_set():
-                    print("\nVoo cancelado pelo usuário."); break
-                
-                self.current_waypoint_index = i + 1
-                p1, p2 = path[i], path[i+1]
-                
-                current_yaw = self.tello.get_yaw()
-                dx, dy = p2[0] - p1[0], p2[1] - p1[1]
-                dist = math.hypot(dx, dy)
-                target_angle = math.degrees(math.atan2(dx, dy))
-                rot = (target_angle - current_yaw + 180) % 360 - 180
-                
-                speed = 0 # Inicia a velocidade do segmento como zero
-
-                if abs(rot) > 5:
-                    if rot > 0: self.tello.rotate_clockwise(int(rot))
-                    else: self.tello.rotate_counter_clockwise(int(-rot))
-                    time.sleep(1.5)
-                
-                if dist > 0 and not self.cancel_event.is_set():
-                    step = int(max(20, min(500, dist)))
-                    
-                    # --- Cálculo de velocidade média ---
-                    t_start = time.time()
-                    self.tello.move_forward(step)
-                    t_end = time.time()
-                    
-                    duration = t_end - t_start
-                    if duration > 0:
-                        speed = dist / duration
-                    
-                    time.sleep(1)
-
-                # Após cada movimento, calcula e envia o estado completo
-                self.angle = self.tello.get_yaw()
-                rad = math.radians(self.angle)
-                self.x += dist * math.sin(rad)
-                self.y += dist * math.cos(rad)
-                self.z = self.tello.get_height()
-                state = self.tello.get_current_state()
-                roll, pitch = state['roll'], state['pitch']
-                relative_time = time.time() - self.start_time
-                
-                current_state = (relative_time, self.x, self.y, self.z, roll, pitch, self.angle, speed, self.current_waypoint_index)
-                self.path_history.append(current_state)
-                self.data_queue.put(current_state)
+            t_mission = time.monotonic()
+            self.flown_paths = []
+            for leg in [path] if next_legs is None else itertools.chain([path], next_legs):
+                if self.cancel_event.is_set(): break
+                t_leg = time.monotonic()
+                self.fly_path(leg)
+                self.flown_paths.append(self.active_path)
+                if next_legs is not None:
+                    print(f"\nTrecho {len(self.flown_paths)} concluído em {(time.monotonic() - t_leg) * self.time_scale:.1f}s")
+            self.mission_time_s = (time.monotonic() - t_mission) * self.time_scale
 
             if not self.cancel_event.is_set():
                 print("\nPlano de voo completo!")
+            print(f"Tempo de missão (modo '{self.executor_mode}'): {self.mission_time_s:.1f}s")
 
         except Exception as e:
             print(f"\nOcorreu um erro durante o voo: {e}")
@@ -118,4 +339,8 @@ class TelloManager:
                     print("Pousando..."); self.tello.land()
                     self.is_flying = False
             except Exception as e:
-                print(f"Não foi possível pousar automaticamente: {e}")
\ No newline at end of file
+                print(f"Não foi possível pousar automaticamente: {e}")
+            self.telemetry.stop()
+            if self.flight_log is not None:
+                self.flight_log.close()
+                print(f"Log do voo salvo em '{self.log_path}'")